@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Workflow Benchmark Suite
+Times the workflow entry points against synthetic repositories and
+session corpora, and compares results with a stored baseline.
+"""
+
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+import io
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+WORKFLOW_SRC = SCRIPTS_DIR.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(WORKFLOW_SRC))
+
+try:
+    import git
+except ImportError:
+    print("Error: Required packages not installed. Run: pip install gitpython pyyaml")
+    sys.exit(1)
+
+from detect_changes import ChangeDetector
+from generate_context import ContextGenerator
+from summarize_changes import summarize_changes
+from history_index import HistoryIndex
+from session_index import SessionIndex
+
+
+LAYOUT = {
+    "learning": ["fundamentals", "llm-workflows", "embeddings", "rag", "agents", "mcp-servers"],
+    "docs": ["guides", "best-practices", "architecture", "api-references", "troubleshooting", "resources"],
+    "pocs": ["llm-workflows", "embeddings", "rag", "agents", "mcp-servers", "automation", "integrations"],
+}
+
+WORDS = [
+    "embedding", "vector", "prompt", "agent", "retrieval", "chunking", "token", "context",
+    "model", "index", "pipeline", "workflow", "latency", "cache", "server", "tool",
+    "memory", "query", "ranking", "document", "summary", "config", "batch", "stream",
+]
+
+DEFAULT_BASELINE = WORKFLOW_SRC / "state" / "benchmarks" / "baseline.json"
+DEFAULT_RESULTS = WORKFLOW_SRC / "state" / "benchmarks" / "latest.json"
+
+
+def _random_text(rng: random.Random, num_lines: int, words_per_line: int = 10) -> str:
+    """Generate deterministic filler text."""
+    return '\n'.join(
+        ' '.join(rng.choice(WORDS) for _ in range(words_per_line))
+        for _ in range(num_lines)
+    ) + '\n'
+
+
+def generate_repo(repo_path: Path, num_commits: int, num_files: int,
+                  diff_lines: int, seed: int = 0) -> git.Repo:
+    """Create a synthetic repository with the learning/docs/pocs layout."""
+    rng = random.Random(seed)
+    repo_path.mkdir(parents=True, exist_ok=True)
+    repo = git.Repo.init(repo_path)
+    with repo.config_writer() as writer:
+        writer.set_value("user", "name", "Benchmark")
+        writer.set_value("user", "email", "benchmark@example.com")
+
+    # Workflow scripts read config and state from the repository itself
+    shutil.copytree(WORKFLOW_SRC / "config", repo_path / ".ai-workflow" / "config")
+    (repo_path / ".ai-workflow" / "state").mkdir(parents=True, exist_ok=True)
+
+    files = ["README.md", "CONTRIBUTING.md"]
+    sections = [(top, sub) for top, subs in LAYOUT.items() for sub in subs]
+    for i in range(max(num_files - len(files), 0)):
+        top, sub = sections[i % len(sections)]
+        name = "README.md" if i < len(sections) else f"notes_{i}.md"
+        if top == "pocs" and i >= len(sections) and i % 3 == 0:
+            name = f"src/module_{i}.py"
+        files.append(f"{top}/{sub}/{name}")
+
+    for path in files:
+        target = repo_path / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(_random_text(rng, diff_lines))
+
+    env = {"GIT_AUTHOR_DATE": "2024-01-01T00:00:00", "GIT_COMMITTER_DATE": "2024-01-01T00:00:00"}
+    with repo.git.custom_environment(**env):
+        repo.git.add("--all")
+        repo.git.commit("-q", "-m", "Initial synthetic content")
+
+        files_per_commit = max(1, min(len(files), num_files // 10 or 1))
+        for n in range(1, num_commits):
+            for path in rng.sample(files, files_per_commit):
+                with open(repo_path / path, "a") as f:
+                    f.write(_random_text(rng, diff_lines))
+            repo.git.add("--all")
+            repo.git.commit("-q", "-m", f"Update {rng.choice(WORDS)} content ({n})")
+
+    return repo
+
+
+def generate_sessions(session_dir: Path, num_sessions: int, lines_per_session: int = 60,
+                      seed: int = 0) -> Path:
+    """Create a synthetic conversation corpus in the session file format."""
+    rng = random.Random(seed)
+    session_dir.mkdir(parents=True, exist_ok=True)
+
+    for i in range(num_sessions):
+        topic = rng.choice(WORDS)
+        content = [
+            f"# Session {i}",
+            f"**Date**: 2024-01-{(i % 28) + 1:02d}",
+            f"**Summary**: Discussion about {topic}",
+            "",
+            _random_text(rng, lines_per_session),
+        ]
+        (session_dir / f"2024-01-{(i % 28) + 1:02d}_{i:06d}.md").write_text('\n'.join(content))
+
+    return session_dir
+
+
+def time_call(func: Callable, repeat: int, setup: Optional[Callable] = None) -> Dict:
+    """Time a callable, returning median/min wall-clock seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "runs": len(timings),
+    }
+
+
+def bench_repo(work_dir: Path, args: argparse.Namespace) -> Dict[str, Dict]:
+    """Benchmark the hook path against a synthetic repository."""
+    repo_path = work_dir / "repo"
+    repo = generate_repo(repo_path, args.commits, args.files, args.diff_lines, args.seed)
+    first_commit = list(repo.iter_commits("HEAD"))[-1].hexsha
+    state_dir = repo_path / ".ai-workflow" / "state"
+
+    def reset_baseline():
+        # Every run starts cold: detection also builds the journal and link index
+        for name in ("change_journal.jsonl", "change_journal.shas", "doc_links.json", "state.json",
+                     "change_manifest.json"):
+            (state_dir / name).unlink(missing_ok=True)
+        (state_dir / "last_processed_commit.txt").write_text(first_commit)
+
+    def run_detect():
+        detector = ChangeDetector(str(repo_path))
+        detector.save_change_manifest(detector.detect_changes())
+
+    results = {}
+    results["detect_changes"] = time_call(run_detect, args.repeat, setup=reset_baseline)
+    results["generate_all"] = time_call(
+        lambda: ContextGenerator(str(repo_path)).generate_all(), args.repeat)
+    results["summarize_changes"] = time_call(
+        lambda: summarize_changes(str(repo_path), args.summary_commits), args.repeat)
+    return results
+
+
+def bench_history(work_dir: Path, args: argparse.Namespace) -> Dict[str, Dict]:
+    """Benchmark building and querying the git history index."""
+    repo_path = work_dir / "repo"
+    state_dir = repo_path / ".ai-workflow" / "state"
+    index = HistoryIndex(str(repo_path), state_dir)
+
+    def reset_index():
+        index.index_file.unlink(missing_ok=True)
+        index.meta_file.unlink(missing_ok=True)
+
+    results = {}
+    results["history_update"] = time_call(index.update, args.repeat, setup=reset_index)
+    results["history_search"] = time_call(lambda: index.search(args.query), args.repeat)
+    return results
+
+
+def bench_search(work_dir: Path, args: argparse.Namespace) -> Dict[str, Dict]:
+    """Benchmark session search against synthetic corpora of each size.
+
+    SessionIndex is timed directly, since MemorySearcher needs the
+    memory.manager package for its session directory and configuration.
+    """
+    results = {}
+    for count in args.sessions:
+        session_dir = generate_sessions(work_dir / f"sessions_{count}", count, seed=args.seed)
+        index = SessionIndex(session_dir)
+
+        results[f"search_index[{count}]"] = time_call(
+            index.refresh, args.repeat, setup=lambda: index.index_file.unlink(missing_ok=True))
+        results[f"search[{count}]"] = time_call(lambda: index.search(args.query), args.repeat)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Print a comparison table and return names of regressed benchmarks."""
+    regressions = []
+    print(f"\n{'benchmark':<24} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<24} {'-':>10} {current['median_s']:>10.4f} {'new':>8}")
+            continue
+
+        change = current["median_s"] / base["median_s"] - 1 if base["median_s"] else 0.0
+        marker = ""
+        if change > threshold:
+            regressions.append(name)
+            marker = " ⚠"
+        print(f"{name:<24} {base['median_s']:>10.4f} {current['median_s']:>10.4f} {change:>+8.1%}{marker}")
+
+    return regressions
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the AI workflow scripts.")
+    parser.add_argument("--commits", type=int, default=50, help="Commits in the synthetic repo")
+    parser.add_argument("--files", type=int, default=200, help="Files in the synthetic repo")
+    parser.add_argument("--diff-lines", type=int, default=20, help="Lines added per changed file")
+    parser.add_argument("--summary-commits", type=int, default=10, help="Commits for summarize_changes")
+    parser.add_argument("--sessions", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[10, 1000], help="Comma-separated session corpus sizes")
+    parser.add_argument("--query", default="chunking", help="Memory search query")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic data")
+    parser.add_argument("--output", type=Path, default=DEFAULT_RESULTS, help="Results JSON file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown before flagging a regression (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    print("=== AI Workflow Benchmarks ===")
+    print(f"Repo: {args.commits} commits, {args.files} files, {args.diff_lines} lines/diff")
+    print(f"Sessions: {', '.join(str(n) for n in args.sessions)}")
+
+    with tempfile.TemporaryDirectory(prefix="ai-workflow-bench-") as tmp:
+        work_dir = Path(tmp)
+        results = bench_repo(work_dir, args)
+        results.update(bench_history(work_dir, args))
+        results.update(bench_search(work_dir, args))
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "commits": args.commits,
+            "files": args.files,
+            "diff_lines": args.diff_lines,
+            "summary_commits": args.summary_commits,
+            "sessions": args.sessions,
+            "query": args.query,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\n✓ Results written: {args.output}")
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("params") != report["params"]:
+            print("⚠ Baseline was recorded with different parameters; comparison may be misleading")
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+    else:
+        compare(results, {}, args.threshold)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"✓ Baseline saved: {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ except ImportError:
     print("Error: Could not import MemoryManager")
     sys.exit(1)
 
+from profiling import profiled
+
 
 def capture_session():
     """Interactively capture a conversation session."""
@@ -82,6 +84,7 @@ def capture_session():
         return
 
 
+@profiled("capture_session")
 def main():
     """Main entry point."""
     # Check for command line arguments
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Change Journal
+Append-only journal with one compact record per processed commit, so each
+commit is categorized exactly once and context can window over history.
+"""
+
+import os
+import re
+import json
+from pathlib import Path
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from state_store import StateStore, atomic_write_text
+
+
+JOURNAL_VERSION = 1
+
+# Keep records compact for bulk commits (vendored files, mass renames)
+MAX_PATHS_PER_RECORD = 500
+
+
+class ChangeJournal:
+    """Reads and appends per-commit change records in state/change_journal.jsonl."""
+
+    def __init__(self, state_dir: Path):
+        self.state_dir = Path(state_dir)
+        self.journal_file = self.state_dir / "change_journal.jsonl"
+        # One SHA per line, so dedup doesn't re-read every full record
+        self.sha_file = self.state_dir / "change_journal.shas"
+        self.store = StateStore(self.state_dir)
+
+    def records(self) -> Iterator[Dict]:
+        """Stream journal records, oldest first."""
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash is skipped, not fatal
+                    continue
+                if record.get("version") == JOURNAL_VERSION:
+                    yield record
+
+    def shas(self) -> Set[str]:
+        """SHAs of every journaled commit, rebuilding the SHA index if it's stale."""
+        if not self.journal_file.exists():
+            self.sha_file.unlink(missing_ok=True)
+            return set()
+
+        # append() writes the index after the journal, so an older index
+        # means a crash in between (or an edited journal)
+        try:
+            if self.sha_file.stat().st_mtime_ns >= self.journal_file.stat().st_mtime_ns:
+                return set(self.sha_file.read_text().split())
+        except OSError:
+            pass
+
+        shas = {record["sha"] for record in self.records()}
+        atomic_write_text(self.sha_file, ''.join(f"{sha}\n" for sha in sorted(shas)))
+        return shas
+
+    def append(self, records: Iterable[Dict]) -> int:
+        """Append records for commits not journaled yet."""
+        with self.store.lock("journal"):
+            known = self.shas()
+            new_records = [r for r in records if r["sha"] not in known]
+            if not new_records:
+                return 0
+
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_file, 'a') as f:
+                for record in new_records:
+                    record["version"] = JOURNAL_VERSION
+                    f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+            with open(self.sha_file, 'a') as f:
+                f.writelines(f"{record['sha']}\n" for record in new_records)
+
+        return len(new_records)
+
+    def window(self, limit: Optional[int] = None, since: Optional[Union[str, date]] = None) -> List[Dict]:
+        """Journal records newest first, limited to the last N commits and/or a start date."""
+        cutoff = parse_since(since) if since else None
+        recent = deque(maxlen=limit) if limit else []
+
+        for record in self.records():
+            if cutoff and datetime.fromisoformat(record["date"]).replace(tzinfo=None) < cutoff:
+                continue
+            recent.append(record)
+
+        return list(reversed(recent))
+
+
+def parse_since(since: Union[str, date, datetime]) -> datetime:
+    """Parse '7d', '12h', '2w', an ISO date or a YAML date value into a naive datetime.
+
+    Raises ValueError for strings in none of these forms.
+    """
+    if isinstance(since, datetime):
+        return since.replace(tzinfo=None)
+    if isinstance(since, date):
+        # YAML loads an unquoted `since: 2024-01-01` as a date
+        return datetime.combine(since, datetime.min.time())
+
+    since = str(since)
+    match = re.fullmatch(r"\s*(\d+)\s*([hdw])\s*", since)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = {"h": timedelta(hours=amount), "d": timedelta(days=amount), "w": timedelta(weeks=amount)}[unit]
+        return datetime.now() - delta
+    return datetime.fromisoformat(since).replace(tzinfo=None)
+
+
+def build_record(commit: Dict, categories: Dict[str, int]) -> Dict:
+    """Build a compact journal record from a parsed commit and its per-file stats."""
+    changes = commit["changes"]
+    paths = [
+        {key: change[key] for key in ("path", "change_type", "lines_added", "lines_deleted",
+                                      "binary", "old_path") if key in change}
+        for change in changes[:MAX_PATHS_PER_RECORD]
+    ]
+
+    record = {
+        "sha": commit["sha"],
+        "parent": commit["parent"],
+        "date": commit["date"],
+        "author": commit["author"],
+        "summary": commit["summary"],
+        "categories": {category: count for category, count in categories.items() if count},
+        "stats": {
+            "files": len(changes),
+            "lines_added": sum(c.get("lines_added", 0) for c in changes),
+            "lines_deleted": sum(c.get("lines_deleted", 0) for c in changes),
+        },
+        "paths": paths,
+        "processed_at": datetime.now().isoformat(),
+    }
+    if len(changes) > MAX_PATHS_PER_RECORD:
+        record["paths_truncated"] = len(changes) - MAX_PATHS_PER_RECORD
+    return record
@@ -10,7 +10,7 @@ import json
 import subprocess
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Optional
+from typing import Dict, Iterator, List, Set, Optional
 
 try:
     import git
@@ -19,6 +19,13 @@ except ImportError:
     print("Error: Required packages not installed. Run: pip install gitpython pyyaml")
     sys.exit(1)
 
+from profiling import profiled
+from doc_links import DocLinkIndex
+from state_store import StateStore
+from change_journal import ChangeJournal, build_record
+from git_paths import FIELD_SEP, PATCH_FORMAT_ARGS, RECORD_SEP, iter_nul_fields, literal_pathspec, unquote_path
+
+
 
 class ChangeDetector:
     """Detects and categorizes changes in the repository."""
@@ -28,6 +35,8 @@ class ChangeDetector:
         self.workflow_dir = self.repo_path / ".ai-workflow"
         self.state_dir = self.workflow_dir / "state"
         self.config_dir = self.workflow_dir / "config"
+        self.store = StateStore(self.state_dir)
+        self.journal = ChangeJournal(self.state_dir)
         
         # Load configuration
         self.config = self._load_config()
@@ -61,15 +70,11 @@ class ChangeDetector:
     
     def _get_last_processed_commit(self) -> Optional[str]:
         """Get the last processed commit hash."""
-        commit_file = self.state_dir / "last_processed_commit.txt"
-        if commit_file.exists():
-            return commit_file.read_text().strip()
-        return None
+        return self.store.read_record().get("last_processed_commit")
     
     def _save_last_processed_commit(self, commit_hash: str):
         """Save the last processed commit hash."""
-        commit_file = self.state_dir / "last_processed_commit.txt"
-        commit_file.write_text(commit_hash)
+        self.store.update_record(last_processed_commit=commit_hash)
     
     def _categorize_file(self, filepath: str) -> str:
         """Categorize file by directory."""
@@ -119,8 +124,265 @@ class ChangeDetector:
         from fnmatch import fnmatch
         return fnmatch(filepath, pattern)
     
+    def _diff_stats(self, last_commit: str, current_commit: str) -> List[Dict]:
+        """Get name-status and numstat for a commit range as one tree diff, without patch text."""
+        name_status = self.repo.git.diff(last_commit, current_commit, "--name-status", "-M", "-z", "--no-color")
+        numstat = self.repo.git.diff(last_commit, current_commit, "--numstat", "-M", "-z", "--no-color")
+        
+        changes = []
+        tokens = name_status.split("\0")
+        i = 0
+        while i < len(tokens) and tokens[i]:
+            status = tokens[i]
+            change_type = status[0]
+            if change_type in ("R", "C"):
+                old_path, path = tokens[i + 1], tokens[i + 2]
+                i += 3
+            else:
+                old_path, path = None, tokens[i + 1]
+                i += 2
+            
+            changes.append(self._new_change(path, change_type, old_path))
+        
+        by_path = {change["path"]: change for change in changes}
+        tokens = numstat.split("\0")
+        i = 0
+        while i < len(tokens) and tokens[i]:
+            added, deleted, path = tokens[i].split("\t", 2)
+            if path:
+                i += 1
+            else:
+                # Renames and copies: "added\tdeleted\t\0old\0new"
+                path = tokens[i + 2]
+                i += 3
+            
+            change = by_path.get(path)
+            if change is None:
+                continue
+            if added == "-":
+                change["binary"] = True
+            else:
+                change["lines_added"] = int(added)
+                change["lines_deleted"] = int(deleted)
+        
+        return changes
+    
+    def _attach_patches(self, last_commit: str, current_commit: str, changes: Dict[str, List[Dict]]):
+        """Fetch patch text for the small text changes that survive context packing."""
+        context_config = self.config.get("context", {})
+        if not context_config.get("include_patches", True):
+            return
+        
+        max_patch_lines = context_config.get("max_patch_lines", 100)
+        # Rough line budget for the whole context file (~40 bytes per diff line)
+        line_budget = context_config.get("max_size_kb", 10) * 1024 // 40
+        
+        selected = {}
+        for category, category_changes in changes.items():
+            if category == "workflow":
+                continue
+            for change in category_changes:
+                lines = change["lines_added"] + change["lines_deleted"]
+                if change["binary"] or lines == 0 or lines > max_patch_lines:
+                    continue
+                if lines > line_budget:
+                    continue
+                line_budget -= lines
+                selected[change["path"]] = change
+        
+        if not selected:
+            return
+        
+        pathspecs = set(selected)
+        pathspecs.update(c["old_path"] for c in selected.values() if c.get("old_path"))
+        patch = self.repo.git.diff(
+            last_commit, current_commit, "-M", *PATCH_FORMAT_ARGS,
+            "--", *sorted(literal_pathspec(p) for p in pathspecs)
+        )
+        
+        for path, hunks in self._split_patch(patch).items():
+            if path in selected:
+                selected[path]["additions"] = hunks
+    
+    def _split_patch(self, patch: str) -> Dict[str, str]:
+        """Split multi-file patch output into hunks keyed by new path."""
+        patches = {}
+        path = None
+        hunks = []
+        
+        def flush():
+            if path is not None:
+                patches[path] = '\n'.join(hunks)
+        
+        for line in patch.split('\n'):
+            if line.startswith("diff --git "):
+                flush()
+                path, hunks = None, []
+            elif not hunks and line[:4] in ("--- ", "+++ "):
+                # git appends a tab to header paths that contain spaces
+                header_path = line[4:].rstrip("\t")
+                if header_path != "/dev/null":
+                    path = unquote_path(header_path)[2:]
+            elif line.startswith("@@") or hunks:
+                hunks.append(line)
+        flush()
+        
+        return patches
+    
+    def _new_change(self, path: str, change_type: str, old_path: Optional[str] = None) -> Dict:
+        """A change entry with empty stats and no patch text."""
+        change_info = {
+            "path": path,
+            "change_type": change_type,
+            "additions": "",
+            "lines_added": 0,
+            "lines_deleted": 0,
+            "binary": False
+        }
+        if old_path:
+            change_info["old_path"] = old_path
+        return change_info
+    
+    def _log_range(self, last_commit: str, current_commit: str) -> List[Dict]:
+        """Per-commit paths and line counts for a range, from a single streamed `git log`."""
+        # Merge commits are skipped; their changes come from the merged commits
+        process = self.repo.git.log(
+            "--reverse", "--no-merges", "--no-show-signature", "-M", "--raw", "--numstat", "-z",
+            "--no-color", f"--format={RECORD_SEP}%H{FIELD_SEP}%P{FIELD_SEP}%an{FIELD_SEP}%ct{FIELD_SEP}%s",
+            f"{last_commit}..{current_commit}",
+            as_process=True
+        )
+        commits = list(self._parse_range_log(iter_nul_fields(process.stdout)))
+        process.wait()
+        return commits
+    
+    def _parse_range_log(self, fields: Iterator[str]) -> Iterator[Dict]:
+        """Parse `git log --raw --numstat -z` output into commits with change entries."""
+        commit = None
+        by_path = {}
+        
+        for field in fields:
+            field = field.lstrip("\n")
+            if field.startswith(RECORD_SEP):
+                if commit is not None:
+                    yield commit
+                sha, parents, author, timestamp, summary = field[1:].split(FIELD_SEP, 4)
+                commit = {
+                    "sha": sha,
+                    "parent": parents.split()[0] if parents else None,
+                    "author": author,
+                    "date": datetime.fromtimestamp(int(timestamp)).isoformat(),
+                    "summary": summary,
+                    "changes": []
+                }
+                by_path = {}
+            elif commit is None or not field:
+                continue
+            elif field.startswith(":"):
+                # Raw entry ":<modes> <shas> <status>", then one path (two for renames)
+                change_type = field.rsplit(" ", 1)[-1][0]
+                if change_type in ("R", "C"):
+                    old_path, path = next(fields), next(fields)
+                else:
+                    old_path, path = None, next(fields)
+                change_info = self._new_change(path, change_type, old_path)
+                commit["changes"].append(change_info)
+                by_path[path] = change_info
+            else:
+                # Numstat entry "added\tdeleted\tpath", or "added\tdeleted\t" then old and new paths
+                added, deleted, path = field.split("\t", 2)
+                if not path:
+                    _, path = next(fields), next(fields)
+                change_info = by_path.get(path)
+                if change_info is None:
+                    continue
+                if added == "-":
+                    change_info["binary"] = True
+                else:
+                    change_info["lines_added"] = int(added)
+                    change_info["lines_deleted"] = int(deleted)
+        
+        if commit is not None:
+            yield commit
+    
+    def _combine_changes(self, commits: List[Dict]) -> List[Dict]:
+        """Compose per-commit changes into one entry per path for the whole range.
+        
+        Line counts are summed across commits (churn, not the net diff).
+        """
+        combined: Dict[str, Dict] = {}
+        
+        for commit in commits:
+            for change in commit["changes"]:
+                path = change["path"]
+                change_type = change["change_type"]
+                
+                if change_type in ("R", "C"):
+                    previous = combined.pop(change["old_path"], None) if change_type == "R" else None
+                    if previous is None:
+                        entry = self._new_change(path, change_type, change["old_path"])
+                    elif previous["change_type"] == "A":
+                        entry = self._new_change(path, "A")
+                    else:
+                        entry = self._new_change(path, "R", previous.get("old_path", change["old_path"]))
+                    if previous is not None:
+                        entry["lines_added"] = previous["lines_added"]
+                        entry["lines_deleted"] = previous["lines_deleted"]
+                        entry["binary"] = previous["binary"]
+                    combined[path] = entry
+                else:
+                    entry = combined.get(path)
+                    if entry is None:
+                        entry = combined[path] = self._new_change(path, change_type)
+                    elif change_type == "D":
+                        combined.pop(path)
+                        if entry["change_type"] == "A":
+                            # Added and deleted within the range
+                            continue
+                        if entry.get("old_path"):
+                            # Renamed then deleted: the original path is what's gone
+                            path = entry["old_path"]
+                        entry = combined[path] = self._new_change(path, "D")
+                    elif entry["change_type"] == "D" and change_type == "A":
+                        entry["change_type"] = "M"
+                
+                entry["lines_added"] += change["lines_added"]
+                entry["lines_deleted"] += change["lines_deleted"]
+                entry["binary"] = entry["binary"] or change["binary"]
+        
+        return [combined[path] for path in sorted(combined)]
+    
+    def _is_ancestor(self, last_commit: str, current_commit: str) -> bool:
+        """Whether the last processed commit is still in HEAD's history."""
+        try:
+            self.repo.git.merge_base("--is-ancestor", last_commit, current_commit)
+            return True
+        except git.GitCommandError:
+            return False
+    
+    def _journal_commits(self, commits: List[Dict]) -> int:
+        """Append a journal record for every unjournaled commit in the range."""
+        records = []
+        for commit in commits:
+            categories = {}
+            for change in commit["changes"]:
+                category = self._categorize_file(change["path"])
+                categories[category] = categories.get(category, 0) + 1
+            records.append(build_record(commit, categories))
+        
+        return self.journal.append(records)
+    
     def detect_changes(self) -> Dict:
         """Detect changes since last processed commit."""
+        # Serialize detection only, so concurrent hooks never process
+        # overlapping commit ranges from the same baseline
+        with self.store.lock("detect"):
+            result = self._detect_changes()
+            result["revision"] = self.store.read_record().get("revision", 0)
+        return result
+    
+    def _detect_changes(self) -> Dict:
+        """Collect changes between the last processed commit and HEAD."""
         current_commit = self.repo.head.commit.hexsha
         last_commit = self._get_last_processed_commit()
         
@@ -154,30 +416,28 @@ class ChangeDetector:
         
         # Get changed files
         try:
-            last_commit_obj = self.repo.commit(last_commit)
-            current_commit_obj = self.repo.commit(current_commit)
-            
-            diffs = last_commit_obj.diff(current_commit_obj)
-            
             changed_files = set()
             
-            for diff in diffs:
-                # Handle different types of changes
-                if diff.a_path:
-                    changed_files.add(diff.a_path)
-                if diff.b_path:
-                    changed_files.add(diff.b_path)
-                
-                category = self._categorize_file(diff.b_path or diff.a_path)
-                
-                change_info = {
-                    "path": diff.b_path or diff.a_path,
-                    "change_type": diff.change_type,
-                    "additions": diff.diff.decode('utf-8', errors='ignore') if diff.diff else ""
-                }
+            # Paths, change types and line counts only - no patch text. The
+            # range stats are composed from the same per-commit log the
+            # journal uses; rewritten history falls back to a tree diff
+            commits = self._log_range(last_commit, current_commit)
+            if self._is_ancestor(last_commit, current_commit):
+                range_changes = self._combine_changes(commits)
+            else:
+                range_changes = self._diff_stats(last_commit, current_commit)
+            
+            for change_info in range_changes:
+                if change_info.get("old_path"):
+                    changed_files.add(change_info["old_path"])
+                changed_files.add(change_info["path"])
                 
+                category = self._categorize_file(change_info["path"])
                 result["changes"][category].append(change_info)
             
+            # Patch text only for files that will be shown in context files
+            self._attach_patches(last_commit, current_commit, result["changes"])
+            
             # Calculate stats
             for category, changes in result["changes"].items():
                 result["stats"][category] = len(changes)
@@ -185,6 +445,12 @@ class ChangeDetector:
             # Detect conflicts
             result["conflicts"] = self._detect_conflicts(changed_files)
             
+            # Re-index links only in the documents that changed
+            DocLinkIndex(self.repo_path, self.state_dir).update(changed_files)
+            
+            # Record each new commit in the range once, for windowed context
+            result["journaled"] = self._journal_commits(commits)
+            
             # Save current commit as processed
             self._save_last_processed_commit(current_commit)
             
@@ -196,10 +462,27 @@ class ChangeDetector:
     def save_change_manifest(self, changes: Dict):
         """Save change detection results as JSON manifest."""
         manifest_file = self.state_dir / "change_manifest.json"
-        with open(manifest_file, 'w') as f:
-            json.dump(changes, f, indent=2)
+        
+        with self.store.lock("manifest"):
+            # Never let a slower, older run overwrite a newer manifest, and
+            # don't replace a manifest with a "no changes" result for the same state
+            if manifest_file.exists():
+                try:
+                    with open(manifest_file) as f:
+                        existing = json.load(f)
+                    existing_revision = existing.get("revision", 0)
+                    revision = changes.get("revision", 0)
+                    if existing_revision > revision:
+                        return
+                    if existing_revision == revision and changes.get("no_changes"):
+                        return
+                except ValueError:
+                    pass
+            
+            self.store.write_json("change_manifest.json", changes)
 
 
+@profiled("detect_changes")
 def main():
     """Main entry point."""
     # Get repository path
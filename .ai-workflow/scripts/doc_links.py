@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Documentation Link Index
+Maintains an index of markdown links and path references between documents
+so docs status can name the exact documents that reference changed files.
+"""
+
+import os
+import re
+import sys
+import json
+import posixpath
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from profiling import profiled
+from state_store import StateStore, atomic_write_json
+
+
+INDEX_VERSION = 2
+
+# Directories and root files whose markdown is indexed
+INDEXED_DIRS = ["docs", "learning", "pocs"]
+INDEXED_ROOT_FILES = ["README.md", "CONTRIBUTING.md", ".github/copilot-instructions.md"]
+
+# Prefixes that mark a backtick-quoted path as repository-relative
+REPO_PREFIXES = ("docs/", "learning/", "pocs/", ".github/", ".ai-workflow/")
+
+MARKDOWN_LINK = re.compile(r'\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+CODE_PATH = re.compile(r'`([\w.-]+(?:/[\w.-]*)+|[\w-]+\.(?:md|py|yaml|yml|json|txt|sh))`')
+
+
+class DocLinkIndex:
+    """Forward index of document references, with an in-memory reverse view."""
+
+    def __init__(self, repo_path: str, state_dir: Path):
+        self.repo_path = Path(repo_path)
+        self.index_file = state_dir / "doc_links.json"
+        self.store = StateStore(state_dir)
+        self.files: Dict[str, List[str]] = {}
+        self._reverse: Dict[str, Set[str]] = {}
+
+    def _is_indexed(self, path: str) -> bool:
+        """Check whether a repo-relative path belongs in the index."""
+        if not path.endswith(".md"):
+            return False
+        return path in INDEXED_ROOT_FILES or path.split("/", 1)[0] in INDEXED_DIRS
+
+    def _normalize(self, doc_path: str, target: str, repo_relative: bool = False) -> str:
+        """Resolve a link target to a repo-relative path, or '' if external."""
+        if "://" in target or target.startswith(("mailto:", "#")):
+            return ""
+
+        target = target.split("#", 1)[0].split("?", 1)[0]
+        if not target:
+            return ""
+
+        if target.startswith("/"):
+            resolved = target.lstrip("/")
+        elif repo_relative:
+            resolved = target
+        else:
+            resolved = posixpath.join(posixpath.dirname(doc_path), target)
+
+        resolved = posixpath.normpath(resolved)
+        if resolved.startswith("..") or resolved == ".":
+            return ""
+        return resolved
+
+    def _extract_refs(self, doc_path: str, content: str) -> List[str]:
+        """Extract link targets and path references from markdown."""
+        refs = set()
+
+        for match in MARKDOWN_LINK.finditer(content):
+            ref = self._normalize(doc_path, match.group(1))
+            if ref:
+                refs.add(ref)
+
+        for match in CODE_PATH.finditer(content):
+            target = match.group(1)
+            repo_relative = target.startswith(REPO_PREFIXES)
+            ref = self._normalize(doc_path, target, repo_relative=repo_relative)
+            # Bare names like `CONTRIBUTING.md` usually mean the repo root
+            if ref and not repo_relative and not (self.repo_path / ref).exists():
+                ref = self._normalize(doc_path, target, repo_relative=True) or ref
+            if ref:
+                refs.add(ref)
+
+        refs.discard(doc_path)
+        return sorted(refs)
+
+    def _index_file(self, doc_path: str):
+        """(Re)index a single document, dropping it if it no longer exists."""
+        full_path = self.repo_path / doc_path
+        try:
+            content = full_path.read_text(errors="ignore")
+        except OSError:
+            self.files.pop(doc_path, None)
+            return
+
+        self.files[doc_path] = self._extract_refs(doc_path, content)
+
+    def _scan_documents(self) -> Iterable[str]:
+        """Walk the indexed directories for markdown files."""
+        for root_file in INDEXED_ROOT_FILES:
+            if (self.repo_path / root_file).exists():
+                yield root_file
+
+        for directory in INDEXED_DIRS:
+            base = self.repo_path / directory
+            if not base.is_dir():
+                continue
+            for dirpath, dirnames, filenames in os.walk(base):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "node_modules"]
+                for filename in filenames:
+                    if filename.endswith(".md"):
+                        yield Path(dirpath, filename).relative_to(self.repo_path).as_posix()
+
+    def load(self) -> bool:
+        """Load the index from disk. Returns False if it must be rebuilt."""
+        if not self.index_file.exists():
+            return False
+
+        try:
+            with open(self.index_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("version") != INDEX_VERSION:
+            return False
+
+        self.files = data.get("files", {})
+        self._reverse = {}
+        return True
+
+    def save(self):
+        """Write the index to disk."""
+        atomic_write_json(self.index_file, {"version": INDEX_VERSION, "files": self.files}, indent=1)
+
+    def rebuild(self):
+        """Index every tracked document from scratch."""
+        self.files = {}
+        for doc_path in self._scan_documents():
+            self._index_file(doc_path)
+        self._reverse = {}
+
+    def update(self, changed_paths: Iterable[str]):
+        """Re-index only the changed documents, building the index on first use."""
+        with self.store.lock("doc_links"):
+            if not self.load():
+                self.rebuild()
+            else:
+                for path in changed_paths:
+                    if self._is_indexed(path):
+                        self._index_file(path)
+                self._reverse = {}
+
+            self.save()
+
+    def _reverse_index(self) -> Dict[str, Set[str]]:
+        """Map each referenced path to the documents referencing it."""
+        if not self._reverse:
+            for doc_path, refs in self.files.items():
+                for ref in refs:
+                    self._reverse.setdefault(ref, set()).add(doc_path)
+        return self._reverse
+
+    def referencing(self, path: str) -> List[str]:
+        """Documents that link to a path or to its immediate directory.
+
+        Bare top-level directories are skipped, so broad mentions like
+        `learning/` don't match every file.
+        """
+        reverse = self._reverse_index()
+        docs = set(reverse.get(path, ()))
+
+        parent = posixpath.dirname(path)
+        if "/" in parent:
+            docs.update(reverse.get(parent, ()))
+
+        docs.discard(path)
+        return sorted(docs)
+
+
+@profiled("doc_links")
+def main():
+    """Rebuild the index and print references to the given paths."""
+    repo_path = os.getenv("REPO_PATH", os.getcwd())
+    index = DocLinkIndex(repo_path, Path(repo_path) / ".ai-workflow" / "state")
+    index.rebuild()
+    index.save()
+    print(f"✓ Indexed {len(index.files)} documents")
+
+    for path in sys.argv[1:]:
+        print(f"\n{path}:")
+        for doc in index.referencing(path) or ["(no references)"]:
+            print(f"  - {doc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import sys
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 try:
     import git
@@ -18,6 +18,12 @@ except ImportError:
     print("Error: Required packages not installed. Run: pip install gitpython pyyaml")
     sys.exit(1)
 
+from profiling import profiled
+from doc_links import DocLinkIndex
+from state_store import StateStore
+from change_journal import ChangeJournal
+from markdown_writer import MarkdownWriter, open_markdown, render_to_string
+
 
 class ContextGenerator:
     """Generates context files from change detection results."""
@@ -27,6 +33,8 @@ class ContextGenerator:
         self.workflow_dir = self.repo_path / ".ai-workflow"
         self.state_dir = self.workflow_dir / "state"
         self.config_dir = self.workflow_dir / "config"
+        self.store = StateStore(self.state_dir)
+        self.journal = ChangeJournal(self.state_dir)
         
         # Load configuration
         self.config = self._load_config()
@@ -65,79 +73,53 @@ class ContextGenerator:
         with open(manifest_file) as f:
             return json.load(f)
     
-    def _summarize_if_needed(self, content: str, max_size_kb: int = 10) -> tuple[str, bool]:
-        """Summarize content if it exceeds size limit."""
-        size_kb = len(content.encode('utf-8')) / 1024
-        
-        if size_kb <= max_size_kb:
-            return content, False
-        
-        # Content is too large, summarize
-        lines = content.split('\n')
-        
-        # Keep header and summary info
-        summary_lines = []
-        summary_lines.append("# Recent Changes (Summarized)")
-        summary_lines.append(f"\n⚠️ **Note**: Full diff exceeded {max_size_kb}KB limit. Showing summary only.\n")
-        
-        # Extract file changes without full diffs
-        in_diff = False
-        current_file = None
-        
-        for line in lines:
-            if line.startswith('## ') or line.startswith('# '):
-                summary_lines.append(line)
-                in_diff = False
-            elif line.startswith('### File:'):
-                current_file = line
-                summary_lines.append(line)
-                in_diff = False
-            elif line.startswith('```diff'):
-                in_diff = True
-                summary_lines.append("```")
-                summary_lines.append("(Diff content omitted for brevity)")
-                summary_lines.append("```")
-            elif line.startswith('```') and in_diff:
-                in_diff = False
-            elif not in_diff:
-                summary_lines.append(line)
-        
-        return '\n'.join(summary_lines), True
+    def _max_bytes(self) -> Optional[int]:
+        """Size budget for recent_changes.md, or None if summarization is off."""
+        context_config = self.config.get("context", {})
+        if not context_config.get("auto_summarize", True):
+            return None
+        return context_config.get("max_size_kb", 10) * 1024
     
     def generate_recent_changes(self) -> str:
         """Generate recent_changes.md file."""
         manifest = self._load_change_manifest()
-        
+        return render_to_string(lambda out: self._render_recent_changes(out, manifest), self._max_bytes())
+    
+    def _render_recent_changes(self, out: MarkdownWriter, manifest: Dict):
+        """Stream recent_changes.md, omitting diffs once the size budget is used up."""
         if not manifest or manifest.get("first_run") or manifest.get("no_changes"):
-            return self._generate_no_changes_message(manifest)
+            self._render_no_changes_message(out, manifest)
+            return
         
-        content = []
-        content.append("# Recent Changes")
-        content.append(f"\n**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        content.append(f"\n**Current Commit**: `{manifest.get('current_commit', 'N/A')[:8]}`")
-        content.append(f"**Last Processed**: `{manifest.get('last_commit', 'N/A')[:8]}`\n")
+        out.line("# Recent Changes")
+        out.line(f"\n**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        out.line(f"\n**Current Commit**: `{manifest.get('current_commit', 'N/A')[:8]}`")
+        out.line(f"**Last Processed**: `{manifest.get('last_commit', 'N/A')[:8]}`\n")
         
         # Add statistics
         stats = manifest.get("stats", {})
         total_changes = sum(stats.values())
         
-        content.append(f"## Summary\n")
-        content.append(f"Total files changed: **{total_changes}**\n")
+        out.line(f"## Summary\n")
+        out.line(f"Total files changed: **{total_changes}**\n")
         
         if stats:
-            content.append("### Changes by Category\n")
+            out.line("### Changes by Category\n")
             for category, count in stats.items():
                 if count > 0:
-                    content.append(f"- **{category}**: {count} files")
-            content.append("")
+                    out.line(f"- **{category}**: {count} files")
+            out.line("")
         
         # Add conflicts if any
         conflicts = manifest.get("conflicts", [])
         if conflicts:
-            content.append(f"## ⚠️ Potential Conflicts ({len(conflicts)})\n")
+            out.line(f"## ⚠️ Potential Conflicts ({len(conflicts)})\n")
             for conflict in conflicts:
-                content.append(f"- **{conflict['file']}**: {conflict['reason']}")
-            content.append("")
+                out.line(f"- **{conflict['file']}**: {conflict['reason']}")
+            out.line("")
+        
+        # Add per-commit history from the journal
+        out.lines(self._journal_section())
         
         # Add detailed changes by category
         changes = manifest.get("changes", {})
@@ -147,49 +129,85 @@ class ContextGenerator:
             if not category_changes:
                 continue
             
-            content.append(f"\n## {category.replace('-', ' ').title()} Changes\n")
+            out.line(f"\n## {category.replace('-', ' ').title()} Changes\n")
             
             for change in category_changes:
                 path = change.get("path", "Unknown")
                 change_type = change.get("change_type", "M")
                 
-                content.append(f"### File: `{path}`")
-                content.append(f"**Change Type**: {self._format_change_type(change_type)}\n")
+                out.line(f"### File: `{path}`")
+                if change.get("old_path"):
+                    out.line(f"**Renamed From**: `{change['old_path']}`")
+                if change.get("binary"):
+                    out.line("**Lines**: binary file")
+                elif "lines_added" in change:
+                    out.line(f"**Lines**: +{change['lines_added']} / -{change.get('lines_deleted', 0)}")
+                out.line(f"**Change Type**: {self._format_change_type(change_type)}\n")
                 
                 # Add diff preview (limited)
                 diff = change.get("additions", "")
                 if diff and len(diff) < 5000:  # Only show small diffs
-                    content.append("```diff")
-                    content.append(diff[:2000])  # Limit diff size
+                    block = ["```diff", diff[:2000]]  # Limit diff size
                     if len(diff) > 2000:
-                        content.append("\n... (diff truncated)")
-                    content.append("```\n")
+                        block.append("\n... (diff truncated)")
+                    block.append("```\n")
+                    out.block(block, fallback=["```", "(Diff content omitted for brevity)", "```\n"])
         
-        full_content = '\n'.join(content)
+        if out.omitted:
+            max_size = out.max_bytes // 1024
+            out.line(f"\n⚠️ **Note**: {out.omitted} diff(s) omitted to stay within the {max_size}KB limit.")
+            print(f"⚠️ Context file summarized (exceeded {max_size}KB)")
+    
+    def _journal_section(self) -> List[str]:
+        """Render the windowed per-commit journal."""
+        context_config = self.config.get("context", {})
+        limit = context_config.get("commits_to_track", 10)
+        since = context_config.get("since")
         
-        # Check size and summarize if needed
-        max_size = self.config.get("context", {}).get("max_size_kb", 10)
-        final_content, was_summarized = self._summarize_if_needed(full_content, max_size)
+        try:
+            records = self.journal.window(limit=limit, since=since)
+        except ValueError:
+            print(f"Warning: Invalid context.since value {since!r}, showing last {limit} commits")
+            since = None
+            records = self.journal.window(limit=limit)
+        if not records:
+            return []
         
-        if was_summarized:
-            print(f"⚠️ Context file summarized (exceeded {max_size}KB)")
+        content = []
+        window = f"since {since}" if since else f"last {limit}"
+        content.append(f"## Recent Commits ({window})\n")
         
-        return final_content
+        for record in records:
+            categories = ", ".join(f"{category}: {count}" for category, count in record.get("categories", {}).items())
+            content.append(f"- `{record['sha'][:8]}` {record['date'][:16].replace('T', ' ')} - "
+                           f"{record['summary']}" + (f" ({categories})" if categories else ""))
+            
+            paths = record.get("paths", [])
+            for change in paths[:5]:
+                content.append(f"  - `{change['path']}` ({change['change_type']})")
+            more = len(paths) - 5 + record.get("paths_truncated", 0)
+            if more > 0:
+                content.append(f"  - ... and {more} more files")
+        
+        content.append("")
+        return content
     
-    def _generate_no_changes_message(self, manifest: Dict) -> str:
-        """Generate message when no changes detected."""
-        content = []
-        content.append("# Recent Changes\n")
-        content.append(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    def _render_no_changes_message(self, out: MarkdownWriter, manifest: Dict):
+        """Render message when no changes detected."""
+        out.line("# Recent Changes\n")
+        out.line(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         
         if manifest.get("first_run"):
-            content.append("ℹ️ **First run** - Baseline established. No changes to report yet.")
+            out.line("ℹ️ **First run** - Baseline established. No changes to report yet.")
         elif manifest.get("no_changes"):
-            content.append("✓ **No changes detected** since last sync.")
+            out.line("✓ **No changes detected** since last sync.")
         else:
-            content.append("ℹ️ No change data available.")
+            out.line("ℹ️ No change data available.")
         
-        return '\n'.join(content)
+        journal_section = self._journal_section()
+        if journal_section:
+            out.line("")
+            out.lines(journal_section)
     
     def _format_change_type(self, change_type: str) -> str:
         """Format git change type."""
@@ -202,18 +220,8 @@ class ContextGenerator:
         }
         return types.get(change_type, change_type)
     
-    def generate_docs_status(self) -> str:
-        """Generate docs_status.md file."""
-        manifest = self._load_change_manifest()
-        
-        content = []
-        content.append("# Documentation Status\n")
-        content.append(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        
-        changes = manifest.get("changes", {})
-        conflicts = manifest.get("conflicts", [])
-        
-        # Determine which docs need updates
+    def docs_needing_update(self, changes: Dict) -> List[str]:
+        """List documentation areas affected by the detected changes."""
         needs_update = []
         
         if changes.get("learning"):
@@ -231,70 +239,119 @@ class ContextGenerator:
         if changes.get("copilot-instructions"):
             needs_update.append("- Copilot instructions file was modified directly")
         
+        return needs_update
+    
+    def _referencing_documents(self, changes: Dict) -> Dict[str, List[str]]:
+        """Map changed paths to the documents that reference them."""
+        index = DocLinkIndex(self.repo_path, self.state_dir)
+        if not index.load():
+            return {}
+        
+        referenced = {}
+        for category, category_changes in changes.items():
+            if category == "workflow":
+                continue
+            for change in category_changes:
+                for path in [change.get("path"), change.get("old_path")]:
+                    if not path:
+                        continue
+                    docs = index.referencing(path)
+                    if docs:
+                        referenced[path] = docs
+        
+        return referenced
+    
+    def generate_docs_status(self) -> str:
+        """Generate docs_status.md file."""
+        manifest = self._load_change_manifest()
+        return render_to_string(lambda out: self._render_docs_status(out, manifest))
+    
+    def _render_docs_status(self, out: MarkdownWriter, manifest: Dict):
+        """Stream docs_status.md."""
+        out.line("# Documentation Status\n")
+        out.line(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        
+        changes = manifest.get("changes", {})
+        conflicts = manifest.get("conflicts", [])
+        
+        # Determine which docs need updates
+        needs_update = self.docs_needing_update(changes)
+        
         if needs_update:
-            content.append("## 📝 Documentation Updates Needed\n")
-            content.extend(needs_update)
-            content.append("")
+            out.line("## 📝 Documentation Updates Needed\n")
+            out.lines(needs_update)
+            out.line("")
         else:
-            content.append("✓ **All documentation appears up-to-date**\n")
+            out.line("✓ **All documentation appears up-to-date**\n")
+        
+        # Documents that link to or mention the changed files
+        referenced = self._referencing_documents(changes)
+        if referenced:
+            out.line("## 🔗 Documents Referencing Changed Files\n")
+            for path, docs in referenced.items():
+                out.line(f"### `{path}`")
+                for doc in docs[:10]:
+                    out.line(f"- `{doc}`")
+                if len(docs) > 10:
+                    out.line(f"- ... and {len(docs) - 10} more documents")
+                out.line("")
         
         # Add conflict warnings
         if conflicts:
-            content.append(f"\n## ⚠️ Conflicts Detected ({len(conflicts)})\n")
+            out.line(f"\n## ⚠️ Conflicts Detected ({len(conflicts)})\n")
             for conflict in conflicts:
-                content.append(f"### {conflict['file']}")
-                content.append(f"- **Issue**: {conflict['reason']}")
-                content.append(f"- **Severity**: {conflict['severity']}\n")
-        
-        return '\n'.join(content)
+                out.line(f"### {conflict['file']}")
+                out.line(f"- **Issue**: {conflict['reason']}")
+                out.line(f"- **Severity**: {conflict['severity']}\n")
     
     def generate_last_sync(self) -> str:
         """Generate last_sync.md file."""
         manifest = self._load_change_manifest()
-        
-        content = []
-        content.append("# Last Sync Status\n")
+        return render_to_string(lambda out: self._render_last_sync(out, manifest))
+    
+    def _render_last_sync(self, out: MarkdownWriter, manifest: Dict):
+        """Stream last_sync.md."""
+        out.line("# Last Sync Status\n")
         
         timestamp = manifest.get("timestamp", "Unknown")
-        current_commit = manifest.get("current_commit", "N/A")
-        last_commit = manifest.get("last_commit", "N/A")
+        current_commit = manifest.get("current_commit") or "N/A"
+        last_commit = manifest.get("last_commit") or "N/A"
         
-        content.append(f"**Last Sync**: {timestamp}")
-        content.append(f"**Current Commit**: `{current_commit[:8] if current_commit != 'N/A' else 'N/A'}`")
-        content.append(f"**Previous Commit**: `{last_commit[:8] if last_commit != 'N/A' else 'N/A'}`\n")
+        out.line(f"**Last Sync**: {timestamp}")
+        out.line(f"**Current Commit**: `{current_commit[:8] if current_commit != 'N/A' else 'N/A'}`")
+        out.line(f"**Previous Commit**: `{last_commit[:8] if last_commit != 'N/A' else 'N/A'}`\n")
         
         if manifest.get("first_run"):
-            content.append("**Status**: ✓ Initial baseline established")
+            out.line("**Status**: ✓ Initial baseline established")
         elif manifest.get("no_changes"):
-            content.append("**Status**: ✓ No changes detected")
+            out.line("**Status**: ✓ No changes detected")
         elif manifest.get("error"):
-            content.append(f"**Status**: ❌ Error - {manifest.get('error')}")
+            out.line(f"**Status**: ❌ Error - {manifest.get('error')}")
         else:
             total_changes = sum(manifest.get("stats", {}).values())
-            content.append(f"**Status**: ✓ {total_changes} changes processed")
-        
-        return '\n'.join(content)
+            out.line(f"**Status**: ✓ {total_changes} changes processed")
     
-    def generate_all(self):
-        """Generate all context files."""
-        # Generate recent_changes.md
-        recent_changes = self.generate_recent_changes()
-        recent_changes_file = self.state_dir / "recent_changes.md"
-        recent_changes_file.write_text(recent_changes)
-        
-        # Generate docs_status.md
-        docs_status = self.generate_docs_status()
-        docs_status_file = self.state_dir / "docs_status.md"
-        docs_status_file.write_text(docs_status)
-        
-        # Generate last_sync.md
-        last_sync = self.generate_last_sync()
-        last_sync_file = self.state_dir / "last_sync.md"
-        last_sync_file.write_text(last_sync)
+    def generate_all(self, outputs: Optional[List[str]] = None):
+        """Generate all context files, or only the named outputs."""
+        renderers = {
+            "recent_changes.md": (self._render_recent_changes, self._max_bytes()),
+            "docs_status.md": (self._render_docs_status, None),
+            "last_sync.md": (self._render_last_sync, None),
+        }
+        
+        # Keep the three files consistent with the same manifest
+        with self.store.lock("context"):
+            manifest = self._load_change_manifest()
+            for filename, (render, max_bytes) in renderers.items():
+                if outputs is not None and filename not in outputs:
+                    continue
+                with open_markdown(self.state_dir / filename, max_bytes) as out:
+                    render(out, manifest)
         
         print("✓ Context files generated successfully")
 
 
+@profiled("generate_context")
 def main():
     """Main entry point."""
     repo_path = os.getenv("REPO_PATH", os.getcwd())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Git Output Helpers
+Shared handling of git log/diff output and pathspecs, so parsers don't
+depend on the user's diff configuration.
+"""
+
+from typing import BinaryIO, Iterator
+
+
+# Separators for custom --format strings; they never appear in paths or names
+RECORD_SEP = "\x1e"
+FIELD_SEP = "\x1f"
+
+# Fixed patch format: user config (color.ui, diff.noprefix, external diff
+# drivers) would otherwise change the headers the parsers rely on
+PATCH_FORMAT_ARGS = ("--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/")
+
+
+def unquote_path(path: str) -> str:
+    """Undo git's C-style quoting of unusual paths."""
+    if not (path.startswith('"') and path.endswith('"')):
+        return path
+    raw = path[1:-1].encode('latin-1', errors='backslashreplace').decode('unicode_escape')
+    return raw.encode('latin-1', errors='ignore').decode('utf-8', errors='ignore')
+
+
+def literal_pathspec(path: str) -> str:
+    """Stop git from treating glob characters or a leading ':' in a path as pathspec magic."""
+    if path.startswith(":") or any(c in path for c in "*?[\\"):
+        return f":(literal){path}"
+    return path
+
+
+def iter_nul_fields(stream: BinaryIO, chunk_size: int = 65536) -> Iterator[str]:
+    """Stream the NUL-separated fields of `-z` output without buffering it all."""
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        *fields, pending = (pending + chunk).split(b"\0")
+        for field in fields:
+            yield field.decode('utf-8', errors='replace')
+
+    if pending:
+        yield pending.decode('utf-8', errors='replace')
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Git History Index
+Incrementally indexes commit messages, touched paths and added lines so
+history questions can be answered without walking `git log -S`.
+"""
+
+import io
+import os
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import git
+except ImportError:
+    print("Error: gitpython not installed. Run: pip install gitpython")
+    sys.exit(1)
+
+from profiling import profiled
+from state_store import StateStore, atomic_write_json
+from git_paths import FIELD_SEP, PATCH_FORMAT_ARGS, RECORD_SEP, unquote_path
+
+
+INDEX_VERSION = 1
+
+# Bound the index size for commits that add huge files
+MAX_ADDED_LINES = 200
+MAX_LINE_LENGTH = 200
+
+
+class HistoryIndex:
+    """Append-only on-disk index of commits, keyed by SHA."""
+
+    def __init__(self, repo_path: str, state_dir: Optional[Path] = None):
+        self.repo_path = Path(repo_path)
+        self.state_dir = state_dir or self.repo_path / ".ai-workflow" / "state"
+        self.index_file = self.state_dir / "history_index.jsonl"
+        self.meta_file = self.state_dir / "history_index_meta.json"
+        self.store = StateStore(self.state_dir)
+
+        try:
+            self.repo = git.Repo(self.repo_path)
+        except git.InvalidGitRepositoryError:
+            print("Error: Not a git repository")
+            sys.exit(1)
+
+    def _load_meta(self) -> Dict:
+        """Load index metadata, discarding it if the format changed."""
+        if not self.meta_file.exists() or not self.index_file.exists():
+            return {}
+
+        try:
+            meta = json.loads(self.meta_file.read_text())
+        except ValueError:
+            return {}
+
+        return meta if meta.get("version") == INDEX_VERSION else {}
+
+    def _parse_log(self, lines: Iterable[str]) -> Iterator[Dict]:
+        """Parse streamed `git log -p -U0` lines produced with the record format below."""
+        header = None
+        record = None
+        in_hunk = False
+
+        for line in lines:
+            line = line.rstrip('\n')
+
+            if line.startswith(RECORD_SEP):
+                if record is not None:
+                    yield self._finish_record(record)
+                header, record = [line[1:]], None
+                continue
+
+            # The commit message may span lines until the final field separator
+            if record is None:
+                if header is None:
+                    continue
+                header.append(line)
+                text = '\n'.join(header)
+                if text.count(FIELD_SEP) >= 4:
+                    sha, author, timestamp, message, _ = text.split(FIELD_SEP, 4)
+                    record = {"sha": sha.strip(), "author": author, "timestamp": timestamp,
+                              "message": message, "paths": [], "added": []}
+                    header = None
+                    in_hunk = False
+                continue
+
+            paths = record["paths"]
+            if line.startswith("diff --git "):
+                # Fallback for binary files, which have no ---/+++ headers
+                paths.append(line.rsplit(" b/", 1)[-1].strip('"'))
+                in_hunk = False
+            elif not in_hunk and line[:4] in ("--- ", "+++ "):
+                header_path = line[4:].rstrip("\t")
+                if header_path != "/dev/null" and paths:
+                    paths[-1] = unquote_path(header_path)[2:]
+            elif line.startswith("@@"):
+                in_hunk = True
+            elif in_hunk and line.startswith("+") and len(record["added"]) < MAX_ADDED_LINES:
+                text = line[1:].strip()
+                if text:
+                    record["added"].append(text[:MAX_LINE_LENGTH])
+
+        if record is not None:
+            yield self._finish_record(record)
+
+    def _finish_record(self, record: Dict) -> Dict:
+        """Convert a parsed commit into its on-disk form."""
+        return {
+            "sha": record["sha"],
+            "author": record["author"],
+            "date": datetime.fromtimestamp(int(record["timestamp"])).strftime('%Y-%m-%d %H:%M'),
+            "message": record["message"].strip(),
+            "paths": sorted(set(record["paths"])),
+            "added": record["added"],
+        }
+
+    def update(self) -> int:
+        """Index commits reachable from HEAD that are not indexed yet."""
+        with self.store.lock("history"):
+            return self._update()
+
+    def _update(self) -> int:
+        """Append records for new commits; caller holds the history lock."""
+        meta = self._load_meta()
+        if not meta:
+            self.index_file.unlink(missing_ok=True)
+
+        head = self.repo.head.commit.hexsha
+        tips = [tip for tip in meta.get("tips", []) if tip != head]
+        if head in meta.get("tips", []):
+            return 0
+
+        # Exclude history already covered by previously indexed tips
+        exclude = []
+        for tip in tips:
+            try:
+                self.repo.commit(tip)
+                exclude.append(f"^{tip}")
+            except (ValueError, git.BadName):
+                continue
+
+        # Stream the log: full-history patch output can be far larger than the index
+        process = self.repo.git.log(
+            "--reverse", "-p", "-U0", *PATCH_FORMAT_ARGS,
+            f"--format={RECORD_SEP}%H{FIELD_SEP}%an{FIELD_SEP}%ct{FIELD_SEP}%B{FIELD_SEP}",
+            head, *exclude,
+            as_process=True
+        )
+        lines = io.TextIOWrapper(process.stdout, encoding='utf-8', errors='replace', newline='\n')
+
+        count = 0
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_file, 'a') as f:
+            indexed_size = f.tell()
+            try:
+                for record in self._parse_log(lines):
+                    f.write(json.dumps(record) + '\n')
+                    count += 1
+                process.wait()
+            except BaseException:
+                # Git failed partway: drop this run's records so the index
+                # and its tips stay consistent
+                f.truncate(indexed_size)
+                raise
+
+        # Keep the newest few tips so branch switches stay incremental
+        meta_tips = [head] + [tip for tip in tips if f"^{tip}" in exclude]
+        atomic_write_json(self.meta_file, {"version": INDEX_VERSION, "tips": meta_tips[:20]}, indent=None)
+        return count
+
+    def records(self) -> Iterator[Dict]:
+        """Stream indexed commit records from disk."""
+        if not self.index_file.exists():
+            return
+
+        with open(self.index_file) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Search commit messages, paths and added lines for the query."""
+        query_lower = query.lower()
+        results = []
+        seen = set()
+
+        for record in self.records():
+            if record["sha"] in seen:
+                continue
+            seen.add(record["sha"])
+
+            message_hits = [l for l in record["message"].split('\n') if query_lower in l.lower()]
+            path_hits = [p for p in record["paths"] if query_lower in p.lower()]
+            added_hits = [l for l in record["added"] if query_lower in l.lower()]
+
+            relevance = len(message_hits) + len(path_hits) + len(added_hits)
+            if not relevance:
+                continue
+
+            matches = []
+            if message_hits:
+                matches.append('\n'.join(message_hits))
+            if path_hits:
+                matches.append('\n'.join(path_hits[:10]))
+            if added_hits:
+                matches.append('\n'.join(f"+ {l}" for l in added_hits[:5]))
+
+            results.append({
+                "source": "commit",
+                "filename": record["sha"][:8],
+                "sha": record["sha"],
+                "date": record["date"],
+                "summary": record["message"].split('\n', 1)[0],
+                "paths": record["paths"],
+                "matches": matches[:3],
+                "relevance": relevance,
+            })
+
+        results.sort(key=lambda x: (x['relevance'], x['date']), reverse=True)
+        return results[:max_results]
+
+
+@profiled("history_index")
+def main():
+    """Main entry point."""
+    repo_path = os.getenv("REPO_PATH", os.getcwd())
+    index = HistoryIndex(repo_path)
+
+    count = index.update()
+    print(f"✓ Indexed {count} new commits")
+
+    if len(sys.argv) > 1:
+        query = ' '.join(sys.argv[1:])
+        for result in index.search(query):
+            print(f"  - {result['filename']} {result['date']}: {result['summary']}")
+
+
+if __name__ == "__main__":
+    main()
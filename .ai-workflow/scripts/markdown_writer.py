@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Streaming Markdown Writer
+Writes markdown line by line to a stream while tracking the encoded size,
+so size budgets can be enforced without rendering the whole file first.
+"""
+
+import io
+import contextlib
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from state_store import atomic_open
+
+
+class MarkdownWriter:
+    """Line-oriented writer with a running UTF-8 byte count and optional budget."""
+
+    def __init__(self, stream: TextIO, max_bytes: Optional[int] = None):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+        self.omitted = 0
+        self._first = True
+
+    def line(self, text: str = ""):
+        """Write one line (output matches '\\n'.join of all lines)."""
+        if not self._first:
+            self.stream.write('\n')
+            self.bytes_written += 1
+        self._first = False
+
+        self.stream.write(text)
+        self.bytes_written += len(text.encode('utf-8'))
+
+    def lines(self, texts: Iterable[str]):
+        """Write several lines."""
+        for text in texts:
+            self.line(text)
+
+    def fits(self, *texts: str) -> bool:
+        """Whether writing these lines would stay within the size budget."""
+        if self.max_bytes is None:
+            return True
+        size = sum(len(text.encode('utf-8')) + 1 for text in texts)
+        return self.bytes_written + size <= self.max_bytes
+
+    def block(self, texts: Iterable[str], fallback: Iterable[str] = ()) -> bool:
+        """Write lines if they fit the budget, otherwise write the fallback instead."""
+        texts = list(texts)
+        if self.fits(*texts):
+            self.lines(texts)
+            return True
+
+        self.omitted += 1
+        self.lines(fallback)
+        return False
+
+
+@contextlib.contextmanager
+def open_markdown(path: Path, max_bytes: Optional[int] = None) -> Iterator[MarkdownWriter]:
+    """Stream markdown into a temp file that atomically replaces `path` on success."""
+    with atomic_open(path) as f:
+        yield MarkdownWriter(f, max_bytes)
+
+
+def render_to_string(render: Callable[[MarkdownWriter], None], max_bytes: Optional[int] = None) -> str:
+    """Run a streaming renderer into memory and return the text."""
+    buffer = io.StringIO()
+    render(MarkdownWriter(buffer, max_bytes))
+    return buffer.getvalue()
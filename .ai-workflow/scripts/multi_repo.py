@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Multi-Repository Driver
+Runs change detection and context generation across many repositories
+in parallel and writes an aggregated cross-repo summary.
+"""
+
+import os
+import io
+import sys
+import glob
+import argparse
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+try:
+    import yaml
+except ImportError:
+    print("Error: Required packages not installed. Run: pip install gitpython pyyaml")
+    sys.exit(1)
+
+from profiling import profiled
+from detect_changes import ChangeDetector
+from generate_context import ContextGenerator
+from state_store import atomic_write_text
+
+
+def process_repo(repo_path: str) -> Dict:
+    """Run detection and context generation for one repository.
+
+    Runs in a worker process; each repository keeps its own state directory.
+    """
+    summary = {"repo": repo_path, "name": Path(repo_path).name}
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            detector = ChangeDetector(repo_path)
+            detector.state_dir.mkdir(parents=True, exist_ok=True)
+            changes = detector.detect_changes()
+            detector.save_change_manifest(changes)
+
+            generator = ContextGenerator(repo_path)
+            generator.generate_all()
+    except SystemExit:
+        summary["error"] = "Not a git repository"
+        return summary
+    except Exception as e:
+        summary["error"] = str(e)
+        return summary
+
+    summary.update({
+        "current_commit": changes.get("current_commit"),
+        "last_commit": changes.get("last_commit"),
+        "first_run": changes.get("first_run", False),
+        "no_changes": changes.get("no_changes", False),
+        "error": changes.get("error"),
+        "stats": changes.get("stats", {}),
+        "conflicts": changes.get("conflicts", []),
+        "paths": {
+            category: [change["path"] for change in category_changes]
+            for category, category_changes in changes.get("changes", {}).items()
+        },
+        "needs_update": generator.docs_needing_update(changes.get("changes", {})),
+        "state_dir": str(detector.state_dir),
+    })
+    return summary
+
+
+class MultiRepoDriver:
+    """Processes a set of repositories in a bounded process pool."""
+
+    def __init__(self, repo_path: str):
+        self.repo_path = Path(repo_path)
+        self.workflow_dir = self.repo_path / ".ai-workflow"
+        self.state_dir = self.workflow_dir / "state"
+        self.config_dir = self.workflow_dir / "config"
+
+        self.config = self._load_config()
+
+    def _load_config(self) -> Dict:
+        """Load workflow configuration."""
+        config_file = self.config_dir / "workflow.yaml"
+        local_config = self.config_dir / "workflow.local.yaml"
+
+        config = {}
+
+        if config_file.exists():
+            with open(config_file) as f:
+                config = yaml.safe_load(f) or {}
+
+        if local_config.exists():
+            with open(local_config) as f:
+                local = yaml.safe_load(f) or {}
+                config.update(local)
+
+        return config
+
+    def resolve_repositories(self, patterns: List[str]) -> List[str]:
+        """Expand paths and globs into a sorted list of git repository roots."""
+        if not patterns:
+            patterns = self.config.get("multi_repo", {}).get("repositories", []) or []
+
+        repos = set()
+        for pattern in patterns:
+            pattern = os.path.expanduser(pattern)
+            for match in glob.glob(pattern) or [pattern]:
+                path = Path(match).resolve()
+                if (path / ".git").exists():
+                    repos.add(str(path))
+
+        return sorted(repos)
+
+    def run(self, repos: List[str], max_workers: int = 0) -> List[Dict]:
+        """Process every repository and return per-repo summaries."""
+        if not max_workers:
+            max_workers = self.config.get("multi_repo", {}).get("max_workers", 0) or os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(repos)))
+
+        results = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(process_repo, repo): repo for repo in repos}
+            for future in as_completed(futures):
+                repo = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A killed worker (OOM, signal) breaks the pool for every
+                    # pending repository; record them instead of aborting
+                    result = {"repo": repo, "name": Path(repo).name,
+                              "error": f"Worker failed: {e or type(e).__name__}"}
+                results.append(result)
+
+                status = "❌" if result.get("error") else "✓"
+                print(f"  {status} {result['name']}")
+
+        results.sort(key=lambda r: r["name"])
+        return results
+
+    def generate_recent_changes(self, results: List[Dict]) -> str:
+        """Generate the aggregated cross-repo recent changes file."""
+        content = []
+        content.append("# Recent Changes (All Repositories)")
+        content.append(f"\n**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        content.append(f"**Repositories**: {len(results)}\n")
+
+        content.append("## Summary\n")
+        content.append("| Repository | Changes | Conflicts | Status |")
+        content.append("|------------|---------|-----------|--------|")
+        for result in results:
+            total_changes = sum(result.get("stats", {}).values())
+            conflicts = len(result.get("conflicts", []))
+            content.append(f"| {result['name']} | {total_changes} | {conflicts} | {self._status(result)} |")
+        content.append("")
+
+        for result in results:
+            total_changes = sum(result.get("stats", {}).values())
+            if not total_changes:
+                continue
+
+            content.append(f"\n## {result['name']}\n")
+            content.append(f"**Path**: `{result['repo']}`")
+            content.append(f"**Commits**: `{(result.get('last_commit') or 'N/A')[:8]}` → "
+                           f"`{(result.get('current_commit') or 'N/A')[:8]}`")
+            content.append(f"**Details**: `{result['state_dir']}/recent_changes.md`\n")
+
+            for category, paths in result.get("paths", {}).items():
+                if not paths:
+                    continue
+                content.append(f"### {category.replace('-', ' ').title()} ({len(paths)})")
+                for path in paths[:20]:
+                    content.append(f"- `{path}`")
+                if len(paths) > 20:
+                    content.append(f"- ... and {len(paths) - 20} more files")
+                content.append("")
+
+        return '\n'.join(content)
+
+    def generate_docs_status(self, results: List[Dict]) -> str:
+        """Generate the aggregated cross-repo documentation status file."""
+        content = []
+        content.append("# Documentation Status (All Repositories)\n")
+        content.append(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+        flagged = [r for r in results if r.get("needs_update") or r.get("conflicts") or r.get("error")]
+        if not flagged:
+            content.append("✓ **All documentation appears up-to-date**\n")
+            return '\n'.join(content)
+
+        for result in flagged:
+            content.append(f"## {result['name']}\n")
+            if result.get("error"):
+                content.append(f"- ❌ **Error**: {result['error']}")
+            content.extend(result.get("needs_update", []))
+            for conflict in result.get("conflicts", []):
+                content.append(f"- ⚠️ `{conflict['file']}`: {conflict['reason']}")
+            content.append("")
+
+        return '\n'.join(content)
+
+    def _status(self, result: Dict) -> str:
+        """Short status label for a repository result."""
+        if result.get("error"):
+            return "❌ Error"
+        if result.get("first_run"):
+            return "Baseline established"
+        if result.get("no_changes"):
+            return "No changes"
+        return "✓ Processed"
+
+    def generate_all(self, results: List[Dict]):
+        """Write the aggregated context files."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+
+        recent_changes_file = self.state_dir / "multi_repo_changes.md"
+        atomic_write_text(recent_changes_file, self.generate_recent_changes(results))
+
+        docs_status_file = self.state_dir / "multi_repo_docs_status.md"
+        atomic_write_text(docs_status_file, self.generate_docs_status(results))
+
+        print(f"✓ Aggregated context written to {self.state_dir}")
+
+
+@profiled("multi_repo")
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Run the AI workflow across many repositories.")
+    parser.add_argument("repos", nargs="*",
+                        help="Repository roots or globs (default: multi_repo.repositories in config)")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="Maximum parallel workers")
+    args = parser.parse_args()
+
+    repo_path = os.getenv("REPO_PATH", os.getcwd())
+    driver = MultiRepoDriver(repo_path)
+
+    repos = driver.resolve_repositories(args.repos)
+    if not repos:
+        print("No repositories found. Pass paths/globs or set multi_repo.repositories in config.")
+        sys.exit(1)
+
+    print(f"Processing {len(repos)} repositories...")
+    results = driver.run(repos, args.workers)
+    driver.generate_all(results)
+
+    failed = [r for r in results if r.get("error")]
+    if failed:
+        print(f"⚠ {len(failed)} repositories failed")
+
+
+if __name__ == "__main__":
+    main()
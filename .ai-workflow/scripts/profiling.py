@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Profiling Hook
+Opt-in cProfile/tracemalloc profiling for workflow script entry points.
+
+Enable with AI_WORKFLOW_PROFILE=1 or `profiling.enabled: true` in the
+workflow configuration. Reports are written to .ai-workflow/state/profiles/.
+"""
+
+import os
+import io
+import cProfile
+import functools
+import pstats
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+PROFILE_ENV_VAR = "AI_WORKFLOW_PROFILE"
+
+
+def _load_profiling_config(workflow_dir: Path) -> Dict:
+    """Load the profiling section of the workflow configuration."""
+    if yaml is None:
+        return {}
+
+    config = {}
+    for name in ["workflow.yaml", "workflow.local.yaml"]:
+        config_file = workflow_dir / "config" / name
+        if config_file.exists():
+            with open(config_file) as f:
+                config.update(yaml.safe_load(f) or {})
+
+    return config.get("profiling", {}) or {}
+
+
+def _is_enabled(settings: Dict) -> bool:
+    """Environment variable wins over configuration."""
+    env_value = os.getenv(PROFILE_ENV_VAR)
+    if env_value is not None and env_value != "":
+        return env_value.lower() not in ["0", "false", "no", "off"]
+    return bool(settings.get("enabled", False))
+
+
+def _setting_count(settings: Dict, key: str, default: int) -> int:
+    """Read a positive integer setting, warning and using the default if it's invalid."""
+    value = settings.get(key, default)
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        count = 0
+
+    if count < 1:
+        print(f"Warning: Invalid profiling.{key} value {value!r}, using {default}")
+        return default
+    return count
+
+
+def _rotate_profiles(profiles_dir: Path, script_name: str, keep: int):
+    """Keep only the newest `keep` runs for a script."""
+    reports = sorted(profiles_dir.glob(f"{script_name}-*.txt"), reverse=True)
+    for report in reports[max(keep, 1):]:
+        report.unlink(missing_ok=True)
+        report.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def _write_report(report_file: Path, script_name: str, profiler: cProfile.Profile,
+                  snapshot: tracemalloc.Snapshot, peak: int, current: int, top_n: int):
+    """Write a human-readable profiling report."""
+    content = []
+    content.append(f"# Profile: {script_name}")
+    content.append(f"Generated: {datetime.now().isoformat()}")
+    content.append("")
+    content.append("## Memory (tracemalloc)")
+    content.append(f"Peak: {peak / 1024:.1f} KB")
+    content.append(f"Current at exit: {current / 1024:.1f} KB")
+    content.append("")
+    content.append(f"### Top {top_n} allocations")
+    for stat in snapshot.statistics("lineno")[:top_n]:
+        content.append(str(stat))
+    content.append("")
+    content.append("## CPU (cProfile, sorted by cumulative time)")
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(top_n * 2)
+    content.append(stream.getvalue())
+
+    report_file.write_text('\n'.join(content))
+
+
+def profiled(script_name: str) -> Callable:
+    """Decorate a script's main() to profile it when profiling is enabled."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            repo_path = os.getenv("REPO_PATH", os.getcwd())
+            workflow_dir = Path(repo_path) / ".ai-workflow"
+            settings = _load_profiling_config(workflow_dir)
+
+            if not _is_enabled(settings):
+                return func(*args, **kwargs)
+
+            profiles_dir = workflow_dir / "state" / "profiles"
+            top_n = _setting_count(settings, "top_allocations", 15)
+            keep = _setting_count(settings, "max_profiles", 20)
+
+            tracemalloc.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                current, peak = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+
+                try:
+                    profiles_dir.mkdir(parents=True, exist_ok=True)
+                    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+                    base = profiles_dir / f"{script_name}-{stamp}"
+                    profiler.dump_stats(str(base.with_suffix(".prof")))
+                    _write_report(base.with_suffix(".txt"), script_name, profiler,
+                                  snapshot, peak, current, top_n)
+                    _rotate_profiles(profiles_dir, script_name, keep)
+                    print(f"✓ Profile written: {base.with_suffix('.txt')} (peak {peak / 1024:.1f} KB)")
+                except OSError as e:
+                    print(f"Warning: Could not write profile: {e}")
+
+        return wrapper
+    return decorator
@@ -7,6 +7,7 @@ Searches stored conversations for relevant context.
 import os
 import sys
 import re
+import sqlite3
 from pathlib import Path
 from typing import List, Dict
 
@@ -19,6 +20,12 @@ except ImportError:
     print("Error: Could not import MemoryManager")
     sys.exit(1)
 
+from profiling import profiled
+from history_index import HistoryIndex
+from session_index import SessionIndex
+from state_store import atomic_write_text
+from markdown_writer import open_markdown
+
 
 class MemorySearcher:
     """Searches conversation memory."""
@@ -28,14 +35,36 @@ class MemorySearcher:
         self.workflow_dir = self.repo_path / ".ai-workflow"
         self.memory_dir = self.workflow_dir / "memory"
         self.manager = MemoryManager(repo_path)
+        self.history = HistoryIndex(repo_path)
     
     def search(self, query: str, max_results: int = 5) -> List[Dict]:
         """Search conversations for query string."""
-        results = []
-        
         user_dir = self.manager._get_user_session_dir()
         if not user_dir:
-            return results
+            return []
+        
+        memory_config = self.manager.config.get("memory", {})
+        index = SessionIndex(
+            user_dir,
+            chunk_lines=memory_config.get("chunk_lines", 40),
+            overlap_lines=memory_config.get("chunk_overlap_lines", 10)
+        )
+        
+        try:
+            results = index.search(query, max_results)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: Session index unavailable ({e}), scanning sessions")
+            results = None
+        
+        # Queries without word characters can't use the index, and substrings
+        # inside words (e.g. "unking") are only found by scanning
+        if not results:
+            results = self._scan_sessions(user_dir, query, max_results)
+        return results
+    
+    def _scan_sessions(self, user_dir: Path, query: str, max_results: int) -> List[Dict]:
+        """Full scan of every session file for a substring match."""
+        results = []
         
         # Case-insensitive search
         query_lower = query.lower()
@@ -62,11 +91,13 @@ class MemorySearcher:
                     matches = self._find_context(content, query, num_context_lines=3)
                     
                     results.append({
+                        "source": "session",
                         "filename": session_file.name,
                         "date": date,
                         "summary": summary,
                         "matches": matches,
-                        "relevance": len(matches)  # Simple relevance score
+                        # Matching lines, the same scale commit results use
+                        "relevance": sum(1 for line in lines if query_lower in line.lower())
                     })
             
             except Exception as e:
@@ -76,6 +107,18 @@ class MemorySearcher:
         results.sort(key=lambda x: x['relevance'], reverse=True)
         return results[:max_results]
     
+    def search_all(self, query: str, max_results: int = 5, include_history: bool = True) -> List[Dict]:
+        """Search saved sessions and git history, merged into one ranking."""
+        results = self.search(query, max_results)
+        
+        if include_history:
+            self.history.update()
+            results.extend(self.history.search(query, max_results))
+        
+        # Both sources score relevance as the number of matching lines
+        results.sort(key=lambda x: x['relevance'], reverse=True)
+        return results[:max_results]
+    
     def _find_context(self, content: str, query: str, num_context_lines: int = 3) -> List[str]:
         """Find query with surrounding context."""
         lines = content.split('\n')
@@ -100,38 +143,48 @@ class MemorySearcher:
         if not results:
             content = """# Relevant Context
 
-No matching conversations found.
+No matching conversations or commits found.
 
 Try different search terms or check if conversations have been saved using:
 ```bash
 python .ai-workflow/scripts/capture_session.py
 ```
 """
-            output_file.write_text(content)
+            atomic_write_text(output_file, content)
             return
         
-        content = [
-            "# Relevant Context\n",
-            f"**Search completed**: Found {len(results)} relevant conversation(s)\n"
-        ]
+        context_config = self.manager.config.get("context", {})
+        max_bytes = None
+        if context_config.get("auto_summarize", True):
+            max_bytes = context_config.get("max_size_kb", 10) * 1024
         
-        for i, result in enumerate(results, 1):
-            content.append(f"\n## {i}. {result['summary']}")
-            content.append(f"**Date**: {result['date']}")
-            content.append(f"**Relevance**: {result['relevance']} matches\n")
+        # Stream results to disk; excerpts past the size budget are dropped
+        with open_markdown(output_file, max_bytes) as out:
+            out.line("# Relevant Context\n")
+            out.line(f"**Search completed**: Found {len(results)} relevant result(s)\n")
             
-            if result['matches']:
-                content.append("### Relevant Excerpts\n")
-                for j, match in enumerate(result['matches'], 1):
-                    content.append(f"#### Excerpt {j}\n")
-                    content.append("```")
-                    content.append(match)
-                    content.append("```\n")
+            for i, result in enumerate(results, 1):
+                if result.get("source") == "commit":
+                    out.line(f"\n## {i}. Commit `{result['filename']}`: {result['summary']}")
+                else:
+                    out.line(f"\n## {i}. {result['summary']}")
+                out.line(f"**Date**: {result['date']}")
+                out.line(f"**Relevance**: {result['relevance']} matches\n")
+                
+                if result.get("paths"):
+                    out.line(f"**Changed files**: {', '.join(f'`{p}`' for p in result['paths'][:10])}\n")
+                
+                if result['matches']:
+                    out.line("### Relevant Excerpts\n")
+                    for j, match in enumerate(result['matches'], 1):
+                        out.line(f"#### Excerpt {j}\n")
+                        out.block(["```", match, "```\n"],
+                                  fallback=["(Excerpt omitted to stay within size limit)\n"])
         
-        output_file.write_text('\n'.join(content))
         print(f"✓ Context file generated: {output_file}")
 
 
+@profiled("search_memory")
 def main():
     """Main entry point."""
     if len(sys.argv) < 2:
@@ -140,34 +193,41 @@ Search Conversation Memory
 
 Usage:
     python search_memory.py "search query"
+    python search_memory.py --no-history "search query"
 
 Example:
     python search_memory.py "RAG implementation"
 
-This searches stored conversations and generates a context file
-that Copilot can read to provide better responses.
+This searches stored conversations and git history (commit messages,
+changed paths and added lines) and generates a context file that
+Copilot can read to provide better responses.
         """)
         sys.exit(1)
     
-    query = ' '.join(sys.argv[1:])
+    args = sys.argv[1:]
+    include_history = "--no-history" not in args
+    query = ' '.join(arg for arg in args if arg != "--no-history")
     
     print(f"Searching for: '{query}'")
     
     repo_path = os.getenv("REPO_PATH", os.getcwd())
     searcher = MemorySearcher(repo_path)
     
-    results = searcher.search(query)
+    results = searcher.search_all(query, include_history=include_history)
     
     if results:
-        print(f"\n✓ Found {len(results)} relevant conversation(s)")
+        print(f"\n✓ Found {len(results)} relevant result(s)")
         for result in results:
-            print(f"  - {result['date']}: {result['summary']}")
+            if result.get("source") == "commit":
+                print(f"  - {result['date']}: [{result['filename']}] {result['summary']}")
+            else:
+                print(f"  - {result['date']}: {result['summary']}")
         
         searcher.generate_context_file(results)
         print("\nCopilot can now read the context file:")
         print("  #file:.ai-workflow/memory/relevant_context.md")
     else:
-        print("\n✗ No matching conversations found")
+        print("\n✗ No matching conversations or commits found")
         searcher.generate_context_file([])
 
 
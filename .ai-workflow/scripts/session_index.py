@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Session Chunk Index
+Indexes saved sessions as fixed-size overlapping chunks with byte offsets
+and per-chunk line-hit counts, so search can rank sessions from the index
+and read only the chunks it returns as excerpts.
+"""
+
+import re
+import sqlite3
+import contextlib
+from pathlib import Path
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+INDEX_VERSION = 2
+INDEX_FILENAME = ".session_index.sqlite"
+
+TERM_PATTERN = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    filename TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    date TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    filename TEXT,
+    chunk INTEGER,
+    start_byte INTEGER,
+    end_byte INTEGER,
+    own_start INTEGER,
+    own_lines INTEGER,
+    PRIMARY KEY (filename, chunk)
+);
+CREATE TABLE IF NOT EXISTS hits (
+    term TEXT,
+    filename TEXT,
+    chunk INTEGER,
+    lines INTEGER
+);
+CREATE INDEX IF NOT EXISTS hits_term ON hits (term);
+CREATE INDEX IF NOT EXISTS hits_file ON hits (filename);
+"""
+
+
+class SessionIndex:
+    """SQLite-backed chunk index for one user's session directory.
+
+    Neighbouring chunks overlap so excerpts keep their context, but each
+    line is owned by exactly one chunk, and hit counts cover owned lines
+    only, so summing them never counts a line twice.
+    """
+
+    def __init__(self, session_dir: Path, chunk_lines: int = 40, overlap_lines: int = 10):
+        self.session_dir = Path(session_dir)
+        self.index_file = self.session_dir / INDEX_FILENAME
+        self.chunk_lines = max(chunk_lines, 1)
+        self.overlap_lines = min(max(overlap_lines, 0), self.chunk_lines - 1)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the index, rebuilding it if the format or chunking changed."""
+        conn = sqlite3.connect(str(self.index_file), timeout=30)
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            settings = f"{INDEX_VERSION}:{self.chunk_lines}:{self.overlap_lines}"
+            row = conn.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+            if row is None or row[0] != settings:
+                conn.executescript("DROP TABLE IF EXISTS sessions; DROP TABLE IF EXISTS chunks; "
+                                   "DROP TABLE IF EXISTS hits;")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('settings', ?)", (settings,))
+            conn.executescript(SCHEMA)
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _chunk_bounds(self, line_starts: List[int]) -> List[Tuple[int, int, int, int, int]]:
+        """Overlapping chunks as (start_byte, end_byte, start_line, own_start, own_end).
+
+        Owned line ranges tile the file: each chunk owns the lines centred
+        in it, leaving half the overlap as context on either side.
+        """
+        num_lines = len(line_starts) - 1
+        step = self.chunk_lines - self.overlap_lines
+        half = self.overlap_lines // 2
+
+        starts = list(range(0, max(num_lines - self.overlap_lines, 1), step))
+        chunks = []
+        for i, start_line in enumerate(starts):
+            end_line = min(start_line + self.chunk_lines, num_lines)
+            own_start = start_line + half if i else 0
+            own_end = starts[i + 1] + half if i + 1 < len(starts) else num_lines
+            chunks.append((line_starts[start_line], line_starts[end_line], start_line, own_start, own_end))
+        return chunks
+
+    def _index_session(self, conn: sqlite3.Connection, session_file: Path, stat):
+        """(Re)index one session file."""
+        filename = session_file.name
+        data = session_file.read_bytes()
+
+        raw_lines = data.split(b'\n')
+        if raw_lines and raw_lines[-1] == b"":
+            raw_lines.pop()
+
+        line_starts = [0]
+        for raw_line in raw_lines:
+            line_starts.append(min(line_starts[-1] + len(raw_line) + 1, len(data)))
+
+        lines = [raw_line.decode('utf-8', errors='ignore') for raw_line in raw_lines]
+
+        date = ""
+        summary = ""
+        for line in lines[:20]:
+            if line.startswith("**Date**:"):
+                date = line.split(":", 1)[1].strip()
+            elif line.startswith("**Summary**:"):
+                summary = line.split(":", 1)[1].strip()
+
+        conn.execute("DELETE FROM chunks WHERE filename = ?", (filename,))
+        conn.execute("DELETE FROM hits WHERE filename = ?", (filename,))
+        conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                     (filename, stat.st_mtime_ns, stat.st_size, date, summary))
+
+        chunk_bounds = self._chunk_bounds(line_starts)
+        for chunk, (start, end, start_line, own_start, own_end) in enumerate(chunk_bounds):
+            # own_start is stored relative to the chunk's first line
+            conn.execute("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)",
+                         (filename, chunk, start, end, own_start - start_line, own_end - own_start))
+
+            # Lines containing each term, over owned lines only
+            line_hits = Counter()
+            for line in lines[own_start:own_end]:
+                line_hits.update(set(TERM_PATTERN.findall(line.lower())))
+            conn.executemany("INSERT INTO hits VALUES (?, ?, ?, ?)",
+                             [(term, filename, chunk, count) for term, count in line_hits.items()])
+
+    def refresh(self) -> int:
+        """Index new or modified sessions and drop deleted ones. Returns files indexed."""
+        if not self.session_dir.is_dir():
+            return 0
+
+        current = {f.name: f for f in self.session_dir.glob("*.md")}
+        indexed = 0
+
+        with self._connect() as conn:
+            known = {row[0]: (row[1], row[2]) for row in
+                     conn.execute("SELECT filename, mtime_ns, size FROM sessions")}
+
+            for filename in set(known) - set(current):
+                conn.execute("DELETE FROM sessions WHERE filename = ?", (filename,))
+                conn.execute("DELETE FROM chunks WHERE filename = ?", (filename,))
+                conn.execute("DELETE FROM hits WHERE filename = ?", (filename,))
+
+            for filename, session_file in current.items():
+                stat = session_file.stat()
+                if known.get(filename) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                self._index_session(conn, session_file, stat)
+                indexed += 1
+
+        return indexed
+
+    def _read_chunk(self, filename: str, start: int, end: int) -> str:
+        """Seek to a chunk and read only its bytes."""
+        with open(self.session_dir / filename, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start).decode('utf-8', errors='ignore')
+
+    def _chunk_excerpts(self, text: str, own_start: int, own_lines: int, query_lower: str,
+                        num_context_lines: int, limit: int) -> List[str]:
+        """Excerpts around query matches on a chunk's owned lines."""
+        lines = text.split('\n')
+        if lines and lines[-1] == "":
+            lines.pop()
+        excerpts = []
+        for i in range(own_start, min(own_start + own_lines, len(lines))):
+            if query_lower in lines[i].lower():
+                start = max(0, i - num_context_lines)
+                end = min(len(lines), i + num_context_lines + 1)
+                excerpts.append('\n'.join(lines[start:end]))
+                if len(excerpts) >= limit:
+                    break
+        return excerpts
+
+    def search(self, query: str, max_results: int = 5, max_excerpts: int = 3,
+               num_context_lines: int = 3) -> Optional[List[Dict]]:
+        """Rank sessions from the index and read excerpts from the best chunks only.
+
+        Relevance is the indexed number of matching lines (for multi-word
+        queries, an upper bound from the rarest word). Returns None when the
+        query has no indexable terms, so callers can fall back to a full scan.
+        """
+        terms = sorted(set(TERM_PATTERN.findall(query.lower())))
+        if not terms:
+            return None
+
+        query_lower = query.lower()
+        self.refresh()
+
+        # Per chunk, the fewest lines matching any one query term (as a word prefix)
+        per_term = " UNION ALL ".join(
+            f"SELECT {i} AS q, filename, chunk, SUM(lines) AS lines FROM hits "
+            f"WHERE term >= ? AND term < ? GROUP BY filename, chunk"
+            for i in range(len(terms))
+        )
+        sql = f"""
+            SELECT p.filename, p.chunk, c.start_byte, c.end_byte, c.own_start, c.own_lines,
+                   MIN(MIN(p.lines, c.own_lines)) AS hits
+            FROM ({per_term}) p JOIN chunks c ON c.filename = p.filename AND c.chunk = p.chunk
+            GROUP BY p.filename, p.chunk
+            HAVING COUNT(*) = ?
+        """
+        params = [bound for term in terms for bound in (term, term + "\U0010ffff")] + [len(terms)]
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+            sessions = {row[0]: (row[1], row[2]) for row in
+                        conn.execute("SELECT filename, date, summary FROM sessions")}
+
+        by_file: Dict[str, List[Tuple]] = {}
+        for filename, *chunk in rows:
+            by_file.setdefault(filename, []).append(tuple(chunk))
+
+        # Rank sessions before reading anything from disk
+        ranked = sorted(by_file.items(), key=lambda item: (sum(c[5] for c in item[1]), item[0]), reverse=True)
+
+        results = []
+        for filename, chunks in ranked:
+            # Densest chunks first; stop reading once there are enough excerpts
+            chunks.sort(key=lambda c: c[5] / max(c[4], 1), reverse=True)
+            matches = []
+            for chunk, start, end, own_start, own_lines, _ in chunks:
+                text = self._read_chunk(filename, start, end)
+                matches.extend(self._chunk_excerpts(text, own_start, own_lines, query_lower,
+                                                    num_context_lines, max_excerpts - len(matches)))
+                if len(matches) >= max_excerpts:
+                    break
+
+            # Every word matched but never as the full query
+            if not matches:
+                continue
+
+            date, summary = sessions.get(filename, ("", ""))
+            results.append({
+                "source": "session",
+                "filename": filename,
+                "date": date,
+                "summary": summary,
+                "matches": matches,
+                "relevance": sum(c[5] for c in chunks)
+            })
+            if len(results) >= max_results:
+                break
+
+        return results
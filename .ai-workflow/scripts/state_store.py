@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+State Store
+Concurrency-safe access to .ai-workflow/state/: advisory file locks,
+write-to-temp-and-rename, and a versioned state record.
+"""
+
+import os
+import json
+import stat
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterator, Optional, TextIO
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+STATE_VERSION = 1
+LOCK_TIMEOUT_SECONDS = 30
+
+
+class StateLockTimeout(TimeoutError):
+    """Raised when a state lock cannot be acquired in time."""
+
+
+def _target_mode(path: Path) -> int:
+    """Mode for a replaced file: keep the existing one, else default to 0666 & ~umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextlib.contextmanager
+def atomic_open(path: Path) -> Iterator[TextIO]:
+    """Open a temp file for writing that replaces `path` only on success."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yield f
+            f.flush()
+            # mkstemp creates 0600 files; don't let os.replace narrow permissions
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), _target_mode(path))
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def atomic_write_text(path: Path, content: str):
+    """Write a file so readers see either the old or the new content."""
+    with atomic_open(path) as f:
+        f.write(content)
+
+
+def atomic_write_json(path: Path, data, indent: Optional[int] = 2):
+    """Serialize JSON and write it atomically."""
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+def _try_lock(f) -> bool:
+    """Try to take an exclusive advisory lock without blocking."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f):
+    """Release an advisory lock taken with _try_lock."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class StateStore:
+    """Locked, atomic access to workflow state files."""
+
+    def __init__(self, state_dir: Path, timeout: float = LOCK_TIMEOUT_SECONDS):
+        self.state_dir = Path(state_dir)
+        self.record_file = self.state_dir / "state.json"
+        self.commit_file = self.state_dir / "last_processed_commit.txt"
+        self.timeout = timeout
+
+    @contextlib.contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        """Hold an advisory lock on one named resource (not the whole state dir)."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        lock_file = self.state_dir / f".{name}.lock"
+
+        with open(lock_file, 'a+') as f:
+            deadline = time.monotonic() + self.timeout
+            while not _try_lock(f):
+                if time.monotonic() >= deadline:
+                    raise StateLockTimeout(f"Timed out waiting for state lock '{name}'")
+                time.sleep(0.05)
+
+            try:
+                yield
+            finally:
+                _unlock(f)
+
+    def write_text(self, name: str, content: str):
+        """Atomically write a file in the state directory."""
+        atomic_write_text(self.state_dir / name, content)
+
+    def write_json(self, name: str, data, indent: Optional[int] = 2):
+        """Atomically write a JSON file in the state directory."""
+        atomic_write_json(self.state_dir / name, data, indent)
+
+    def read_record(self) -> Dict:
+        """Load the versioned state record, migrating older layouts."""
+        record = {}
+        if self.record_file.exists():
+            try:
+                record = json.loads(self.record_file.read_text())
+            except ValueError:
+                record = {}
+
+        if record.get("version") != STATE_VERSION:
+            record = {"version": STATE_VERSION, "revision": 0}
+
+        # last_processed_commit.txt is always written together with the record,
+        # so a mismatch means it was set externally (e.g. setup.sh baseline)
+        if self.commit_file.exists():
+            commit = self.commit_file.read_text().strip() or None
+            if commit != record.get("last_processed_commit"):
+                record["last_processed_commit"] = commit
+
+        return record
+
+    def update_record(self, **fields) -> Dict:
+        """Update the state record under its lock and bump its revision."""
+        with self.lock("state"):
+            record = self.read_record()
+            record.update(fields)
+            record["revision"] = record.get("revision", 0) + 1
+            record["updated_at"] = datetime.now().isoformat()
+
+            self.write_json("state.json", record)
+            if "last_processed_commit" in fields:
+                self.write_text("last_processed_commit.txt", fields["last_processed_commit"] or "")
+
+        return record
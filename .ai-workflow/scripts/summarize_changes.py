@@ -15,6 +15,9 @@ except ImportError:
     print("Error: gitpython not installed. Run: pip install gitpython")
     sys.exit(1)
 
+from profiling import profiled
+from markdown_writer import open_markdown
+
 
 def summarize_changes(repo_path: str, num_commits: int = 10):
     """Generate a summary of recent commits."""
@@ -31,46 +34,44 @@ def summarize_changes(repo_path: str, num_commits: int = 10):
         print("No commits found")
         return
     
-    # Build summary
-    content = []
-    content.append("# Recent Commits Summary\n")
-    content.append(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    content.append(f"**Commits analyzed**: {len(commits)}\n")
-    
-    for i, commit in enumerate(commits, 1):
-        content.append(f"## {i}. {commit.summary}")
-        content.append(f"**Author**: {commit.author.name}")
-        content.append(f"**Date**: {datetime.fromtimestamp(commit.committed_date).strftime('%Y-%m-%d %H:%M')}")
-        content.append(f"**SHA**: `{commit.hexsha[:8]}`\n")
-        
-        # Get changed files
-        if commit.parents:
-            diffs = commit.parents[0].diff(commit)
-            
-            if diffs:
-                content.append("**Changed files**:")
-                for diff in diffs[:10]:  # Limit to 10 files per commit
-                    path = diff.b_path or diff.a_path
-                    change_type = diff.change_type
-                    content.append(f"- `{path}` ({change_type})")
-                
-                if len(diffs) > 10:
-                    content.append(f"- ... and {len(diffs) - 10} more files")
-        
-        content.append("")
-    
     # Save to state directory
     workflow_dir = Path(repo_path) / ".ai-workflow"
     state_dir = workflow_dir / "state"
-    state_dir.mkdir(parents=True, exist_ok=True)
-    
     summary_file = state_dir / "commit_summary.md"
-    summary_file.write_text('\n'.join(content))
+    
+    # Stream the summary straight to disk
+    with open_markdown(summary_file) as out:
+        out.line("# Recent Commits Summary\n")
+        out.line(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        out.line(f"**Commits analyzed**: {len(commits)}\n")
+        
+        for i, commit in enumerate(commits, 1):
+            out.line(f"## {i}. {commit.summary}")
+            out.line(f"**Author**: {commit.author.name}")
+            out.line(f"**Date**: {datetime.fromtimestamp(commit.committed_date).strftime('%Y-%m-%d %H:%M')}")
+            out.line(f"**SHA**: `{commit.hexsha[:8]}`\n")
+            
+            # Get changed files
+            if commit.parents:
+                diffs = commit.parents[0].diff(commit)
+                
+                if diffs:
+                    out.line("**Changed files**:")
+                    for diff in diffs[:10]:  # Limit to 10 files per commit
+                        path = diff.b_path or diff.a_path
+                        change_type = diff.change_type
+                        out.line(f"- `{path}` ({change_type})")
+                    
+                    if len(diffs) > 10:
+                        out.line(f"- ... and {len(diffs) - 10} more files")
+            
+            out.line("")
     
     print(f"✓ Summary generated: {summary_file}")
     print(f"  Analyzed {len(commits)} commits")
 
 
+@profiled("summarize_changes")
 def main():
     """Main entry point."""
     repo_path = os.getenv("REPO_PATH", os.getcwd())
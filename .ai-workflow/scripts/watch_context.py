@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Context Watcher
+Keeps context files fresh by watching HEAD for checkouts, pulls, merges
+and rebases, which do not trigger the post-commit hook.
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import contextlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import git
+except ImportError:
+    print("Error: Required packages not installed. Run: pip install gitpython pyyaml")
+    sys.exit(1)
+
+from profiling import profiled
+from detect_changes import ChangeDetector
+from generate_context import ContextGenerator
+from state_store import StateStore, StateLockTimeout
+
+
+class ContextWatcher:
+    """Polls git HEAD and regenerates context files when it moves."""
+
+    def __init__(self, repo_path: str, interval: Optional[float] = None,
+                 debounce: Optional[float] = None, idle_timeout: Optional[float] = None):
+        # Detector and generator stay warm for the lifetime of the watcher
+        self.detector = ChangeDetector(repo_path)
+        self.generator = ContextGenerator(repo_path)
+        self.state_dir = self.detector.state_dir
+        self.pid_file = self.state_dir / "watch.pid"
+
+        watch_config = self.detector.config.get("watch", {}) or {}
+        self.interval = interval if interval is not None else watch_config.get("interval_seconds", 2)
+        self.debounce = debounce if debounce is not None else watch_config.get("debounce_seconds", 1)
+        if idle_timeout is None:
+            idle_timeout = watch_config.get("idle_timeout_minutes", 60) * 60
+        self.idle_timeout = idle_timeout
+
+        repo = self.detector.repo
+        self.git_dir = Path(repo.git_dir)
+        self.common_dir = Path(repo.common_dir)
+        self._running = False
+
+    def _ref_paths(self) -> Tuple[Path, ...]:
+        """Files whose mtimes change when HEAD or the current branch moves."""
+        paths = [self.git_dir / "HEAD", self.common_dir / "packed-refs"]
+
+        head = self.git_dir / "HEAD"
+        try:
+            head_content = head.read_text().strip()
+        except OSError:
+            head_content = ""
+
+        if head_content.startswith("ref:"):
+            ref = head_content.split(":", 1)[1].strip()
+            paths.append(self.common_dir / ref)
+
+        return tuple(paths)
+
+    def _signature(self) -> Tuple:
+        """Cheap fingerprint of HEAD state based on file mtimes."""
+        signature = []
+        for path in self._ref_paths():
+            try:
+                signature.append((str(path), path.stat().st_mtime_ns))
+            except OSError:
+                signature.append((str(path), None))
+        return tuple(signature)
+
+    def regenerate(self) -> Dict:
+        """Run detection and regenerate the outputs affected by HEAD moving."""
+        current_commit = self.detector.repo.head.commit.hexsha
+        if current_commit == self.detector._get_last_processed_commit():
+            return {"no_changes": True}
+
+        changes = self.detector.detect_changes()
+        self.detector.save_change_manifest(changes)
+
+        if changes.get("error"):
+            self.generator.generate_all(outputs=["last_sync.md"])
+        else:
+            self.generator.generate_all()
+
+        return changes
+
+    def stop(self, *_):
+        """Stop the watch loop after the current iteration."""
+        self._running = False
+
+    def run(self):
+        """Watch HEAD until stopped or idle for longer than the timeout."""
+        # The watch lock is held for the daemon's lifetime, so only one
+        # watcher runs per repository even when several start at once
+        with contextlib.ExitStack() as stack:
+            try:
+                stack.enter_context(StateStore(self.state_dir, timeout=0).lock("watch"))
+            except StateLockTimeout:
+                print(f"✓ Watcher already running (pid file: {self.pid_file})")
+                return
+
+            self._watch()
+
+    def _watch(self):
+        """Poll loop; caller holds the watch lock."""
+        self.pid_file.write_text(str(os.getpid()))
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        print(f"✓ Watching {self.git_dir} (interval {self.interval}s, "
+              f"idle timeout {self.idle_timeout / 60:g} min)")
+
+        last_signature = self._signature()
+        last_activity = time.monotonic()
+        pending_since = None
+        self._running = True
+
+        try:
+            # Catch up on anything that happened while no watcher was running
+            try:
+                self.regenerate()
+            except (git.GitError, ValueError, OSError) as e:
+                print(f"Warning: Regeneration failed: {e}")
+
+            while self._running:
+                time.sleep(self.interval)
+                now = time.monotonic()
+
+                signature = self._signature()
+                if signature != last_signature:
+                    last_signature = signature
+                    pending_since = now
+                    last_activity = now
+
+                # Wait for HEAD to settle (e.g. mid-rebase) before regenerating
+                if pending_since is not None and now - pending_since >= self.debounce:
+                    pending_since = None
+                    try:
+                        changes = self.regenerate()
+                    except (git.GitError, ValueError, OSError) as e:
+                        print(f"Warning: Regeneration failed: {e}")
+                        continue
+                    if not changes.get("no_changes"):
+                        total_changes = sum(changes.get("stats", {}).values())
+                        print(f"✓ HEAD moved - {total_changes} changes processed")
+
+                if self.idle_timeout and now - last_activity >= self.idle_timeout:
+                    print("✓ Idle timeout reached - stopping watcher")
+                    break
+        finally:
+            if self.pid_file.exists() and self.pid_file.read_text().strip() == str(os.getpid()):
+                self.pid_file.unlink()
+
+
+@profiled("watch_context")
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Keep AI workflow context files fresh.")
+    parser.add_argument("--interval", type=float, help="Seconds between HEAD polls")
+    parser.add_argument("--debounce", type=float, help="Seconds HEAD must be stable before regenerating")
+    parser.add_argument("--idle-timeout", type=float, help="Minutes without HEAD movement before exiting (0 = never)")
+    args = parser.parse_args()
+
+    repo_path = os.getenv("REPO_PATH", os.getcwd())
+    idle_timeout = args.idle_timeout * 60 if args.idle_timeout is not None else None
+
+    watcher = ContextWatcher(repo_path, args.interval, args.debounce, idle_timeout)
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()